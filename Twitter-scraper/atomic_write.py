@@ -0,0 +1,13 @@
+import json
+import os
+
+def write_json_atomic(data, path, **dump_options):
+    """
+    Write data as JSON to path through a temporary file and os.replace, so
+    readers polling the file never see a partial write. dump_options are
+    passed to json.dump (indent, separators, ...).
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_options)
+    os.replace(tmp_path, path)
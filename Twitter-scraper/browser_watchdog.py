@@ -0,0 +1,146 @@
+import logging
+
+import metrics
+
+logger = logging.getLogger("browser_watchdog")
+
+# Recycle a search page once its JS heap or DOM grows past these
+PAGE_HEAP_LIMIT_MB = 150
+PAGE_NODE_LIMIT = 20000
+# Recycle a page after this many searches regardless of its readings
+PAGE_MAX_USES = 60
+# Recycle the whole browser context once Chromium's total RSS passes this
+BROWSER_RSS_LIMIT_MB = 1500
+
+def _read_rss_mb(pid):
+    """Resident set size of a process from /proc, or None if it can't be read"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+class BrowserWatchdog:
+    """
+    Keeps long scraping sessions from slowly bloating Chromium.
+
+    After each search the page is sampled through CDP (JS heap and DOM node
+    counts) and the browser's total process RSS is read from /proc. A page
+    that crosses PAGE_HEAP_LIMIT_MB, PAGE_NODE_LIMIT or PAGE_MAX_USES is
+    replaced by a fresh page in the same context. When total RSS crosses
+    BROWSER_RSS_LIMIT_MB the caller is told to recycle the whole context,
+    carrying its cookies over, at the next point where no search is running.
+    Every sample is published to the metrics module.
+    """
+
+    def __init__(self, browser, heap_limit_mb=PAGE_HEAP_LIMIT_MB, node_limit=PAGE_NODE_LIMIT,
+                 max_uses=PAGE_MAX_USES, rss_limit_mb=BROWSER_RSS_LIMIT_MB):
+        self.browser = browser
+        self.heap_limit_mb = heap_limit_mb
+        self.node_limit = node_limit
+        self.max_uses = max_uses
+        self.rss_limit_mb = rss_limit_mb
+        self.context_recycle_due = False
+        self._sessions = {}
+        self._uses = {}
+        self._browser_session = None
+
+    async def _page_session(self, page):
+        session = self._sessions.get(page)
+        if session is None:
+            session = await page.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            self._sessions[page] = session
+        return session
+
+    async def sample_page(self, page):
+        """JS heap (MB) and DOM node count for a page, via CDP"""
+        session = await self._page_session(page)
+        response = await session.send("Performance.getMetrics")
+        values = {item["name"]: item["value"] for item in response.get("metrics", [])}
+        return values.get("JSHeapUsedSize", 0) / (1024 * 1024), int(values.get("Nodes", 0))
+
+    async def browser_rss_mb(self):
+        """Total RSS of all Chromium processes, or None if it can't be determined"""
+        try:
+            if self._browser_session is None:
+                self._browser_session = await self.browser.new_browser_cdp_session()
+            info = await self._browser_session.send("SystemInfo.getProcessInfo")
+        except Exception as e:
+            logger.debug(f"Could not query browser process info: {e}")
+            return None
+
+        readings = [_read_rss_mb(process["id"]) for process in info.get("processInfo", [])]
+        readings = [rss for rss in readings if rss is not None]
+        return sum(readings) if readings else None
+
+    async def check_page(self, page):
+        """
+        Sample a page after a search and return the page to keep using: the
+        same one, or a fresh page in the same context if it crossed a limit
+        """
+        self._uses[page] = self._uses.get(page, 0) + 1
+        try:
+            heap_mb, nodes = await self.sample_page(page)
+        except Exception as e:
+            logger.warning(f"Could not sample page memory: {e}")
+            heap_mb, nodes = 0, 0
+
+        rss_mb = await self.browser_rss_mb()
+        metrics.observe("page_js_heap_mb", round(heap_mb, 1))
+        metrics.observe("page_dom_nodes", nodes)
+        if rss_mb is not None:
+            metrics.observe("browser_rss_mb", round(rss_mb, 1))
+            if rss_mb > self.rss_limit_mb and not self.context_recycle_due:
+                logger.warning(f"Browser RSS {rss_mb:.0f} MB over {self.rss_limit_mb} MB, context recycle due")
+                self.context_recycle_due = True
+
+        reason = None
+        if heap_mb > self.heap_limit_mb:
+            reason = f"JS heap {heap_mb:.0f} MB"
+        elif nodes > self.node_limit:
+            reason = f"{nodes} DOM nodes"
+        elif self._uses[page] >= self.max_uses:
+            reason = f"{self._uses[page]} searches"
+
+        if reason is None:
+            return page
+        return await self.recycle_page(page, reason)
+
+    async def recycle_page(self, page, reason):
+        """Replace a page with a fresh one in the same context (cookies are per context, so they carry over)"""
+        logger.info(f"Recycling search page after {reason}")
+        new_page = await page.context.new_page()
+        await self.forget_page(page)
+        await page.close()
+        metrics.incr("pages_recycled")
+        return new_page
+
+    async def recycle_context(self, context, context_factory, pages):
+        """
+        Move to a fresh context with the same cookies, closing the old one and its pages.
+        Returns the new context and one new page per page passed in.
+        """
+        logger.info(f"Recycling browser context with {len(pages)} pages")
+        cookies = await context.cookies()
+        new_context = await context_factory(self.browser)
+        await new_context.add_cookies(cookies)
+        new_pages = [await new_context.new_page() for _ in pages]
+        for page in pages:
+            await self.forget_page(page)
+        await context.close()
+        self.context_recycle_due = False
+        metrics.incr("contexts_recycled")
+        return new_context, new_pages
+
+    async def forget_page(self, page):
+        self._uses.pop(page, None)
+        session = self._sessions.pop(page, None)
+        if session is not None:
+            try:
+                await session.detach()
+            except Exception:
+                pass
@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import logging
+from collections import deque
+
+import metrics
+
+logger = logging.getLogger("gemini_client")
+
+GEMINI_MODEL = "models/gemini-2.0-flash"
+# Hard limit on one analysis, hedges included; a coin that hits it gets no sentiment
+GEMINI_DEADLINE_SECONDS = 45.0
+# Send a duplicate request on another key once a call has taken longer than
+# this percentile of recent response times
+HEDGE_PERCENTILE = 0.9
+# At most this fraction of calls may be hedged, so hedging can't double quota use
+HEDGE_BUDGET = 0.1
+# Recent response times kept for the percentile, and how many are needed before trusting it
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 10
+# Hedge delay used until enough response times have been seen
+INITIAL_HEDGE_DELAY = 10.0
+
+class GeminiError(Exception):
+    """No valid Gemini response could be obtained for a request"""
+
+class HedgedGeminiClient:
+    """
+    Async Gemini client with a deadline per request and hedged retries.
+
+    Each request goes to the next API key in rotation. If no reply has arrived
+    after the hedge delay (HEDGE_PERCENTILE of recent response times), the same
+    request is also sent on a different key and whichever valid answer arrives
+    first is used; the other call is cancelled. A request whose first attempt
+    fails outright is hedged straight away. Hedges are capped at HEDGE_BUDGET of
+    all requests, and nothing runs past the deadline.
+
+    Counters gemini_requests, gemini_hedges_sent, gemini_hedges_won,
+    gemini_deadline_exceeded and gemini_failures, and the gemini_latency_seconds
+    distribution, are published to the metrics module.
+    """
+
+    def __init__(self, api_keys, model=GEMINI_MODEL, deadline=GEMINI_DEADLINE_SECONDS,
+                 hedge_percentile=HEDGE_PERCENTILE, hedge_budget=HEDGE_BUDGET,
+                 window=LATENCY_WINDOW, initial_hedge_delay=INITIAL_HEDGE_DELAY):
+        if not api_keys:
+            raise ValueError("At least one Gemini API key is required")
+        self.api_keys = list(api_keys)
+        self.model = model
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.initial_hedge_delay = initial_hedge_delay
+        self.requests = 0
+        self.hedges = 0
+        self._latencies = deque(maxlen=window)
+        self._key_order = itertools.cycle(range(len(self.api_keys)))
+        # grpc async clients belong to the event loop they were created on
+        self._clients = {}
+        self._clients_loop = None
+
+    @property
+    def hedge_delay(self):
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return min(self.initial_hedge_delay, self.deadline)
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))
+        return min(ordered[index], self.deadline)
+
+    def _can_hedge(self):
+        return len(self.api_keys) > 1 and self.hedges + 1 <= self.hedge_budget * self.requests
+
+    def _client(self, key):
+        loop = asyncio.get_running_loop()
+        if loop is not self._clients_loop:
+            self._clients = {}
+            self._clients_loop = loop
+
+        client = self._clients.get(key)
+        if client is None:
+            from google.ai import generativelanguage as glm
+
+            client = self._clients[key] = glm.GenerativeServiceAsyncClient(client_options={"api_key": key})
+        return client
+
+    async def _attempt(self, key, prompt, parse, timeout):
+        from google.ai import generativelanguage as glm
+
+        request = glm.GenerateContentRequest(
+            model=self.model,
+            contents=[glm.Content(parts=[glm.Part(text=prompt)])],
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await self._client(key).generate_content(request, timeout=timeout)
+        latency = loop.time() - started
+        self._latencies.append(latency)
+        metrics.observe("gemini_latency_seconds", round(latency, 3))
+
+        text = "".join(part.text for part in response.candidates[0].content.parts)
+        return parse(text) if parse else text
+
+    async def generate(self, prompt, parse=None, label=""):
+        """
+        Return the first valid answer to prompt, or raise GeminiError.
+        parse turns the response text into a result; returning None marks the
+        response as invalid, so a hedge still in flight gets a chance to answer.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.deadline
+        self.requests += 1
+        metrics.incr("gemini_requests")
+
+        first = next(self._key_order)
+        keys = self.api_keys[first:] + self.api_keys[:first]
+        pending = {asyncio.create_task(self._attempt(keys[0], prompt, parse, self.deadline)): keys[0]}
+        hedged = False
+        errors = []
+
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                wait_for = remaining
+                if not hedged and self._can_hedge():
+                    wait_for = min(remaining, max(0.0, started + self.hedge_delay - loop.time()))
+                done, _ = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    key = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    if result is None:
+                        errors.append(GeminiError("invalid response"))
+                        continue
+                    if hedged and key != keys[0]:
+                        metrics.incr("gemini_hedges_won")
+                        logger.info(f"Hedged Gemini request won for {label} after {loop.time() - started:.1f}s")
+                    return result
+
+                # Slow or failed first attempt: duplicate it on the next key
+                if not hedged and self._can_hedge() and deadline - loop.time() > 0:
+                    hedged = True
+                    self.hedges += 1
+                    metrics.incr("gemini_hedges_sent")
+                    reason = "failed" if not pending else f"no reply after {loop.time() - started:.1f}s"
+                    logger.info(f"Hedging Gemini request for {label} ({reason})")
+                    task = asyncio.create_task(self._attempt(keys[1], prompt, parse, deadline - loop.time()))
+                    pending[task] = keys[1]
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if loop.time() >= deadline:
+            # Count the miss so the hedge delay keeps reflecting slow responses
+            self._latencies.append(self.deadline)
+            metrics.incr("gemini_deadline_exceeded")
+            raise GeminiError(f"no valid reply within {self.deadline:g}s")
+
+        metrics.incr("gemini_failures")
+        raise GeminiError(f"all attempts failed: {errors[-1] if errors else 'unknown error'}")
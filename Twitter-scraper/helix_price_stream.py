@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from atomic_write import write_json_atomic
+from log_setup import setup_logging
+
+logger = logging.getLogger("helix_price_stream")
+
+# Get the script's directory for relative file paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Page to keep open while capturing; override to point at a local replay server
+HELIX_STREAM_URL = os.getenv("HELIX_STREAM_URL", "https://helixapp.com/spot/inj-usdt")
+# Compact snapshot of the latest prices, rewritten every SNAPSHOT_INTERVAL seconds
+PRICE_SNAPSHOT_FILE = os.path.join(SCRIPT_DIR, "helix_prices.json")
+# Detailed Helix data, used to map market IDs in stream frames back to symbols
+HELIX_DETAILED_DATA_FILE = os.path.join(SCRIPT_DIR, "helix_detailed_data.json")
+SNAPSHOT_INTERVAL = 10
+# Snapshots older than this are ignored by the scoring step
+PRICE_SNAPSHOT_MAX_AGE = 300
+
+# Field names Helix / Injective market-data messages use for the parts we need
+SYMBOL_KEYS = ("ticker", "symbol", "marketTicker")
+MARKET_ID_KEYS = ("marketId", "market_id")
+PRICE_KEYS = ("lastPrice", "price", "markPrice", "close")
+CHANGE_KEYS = ("change24h", "priceChange24h", "change", "changePercent")
+VOLUME_KEYS = ("volume24h", "volume", "quoteVolume")
+
+def _to_float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        clean = re.sub(r'[^\d.+-]', '', value)
+        try:
+            return float(clean) if clean else None
+        except ValueError:
+            return None
+    return None
+
+def _first(mapping, keys):
+    for key in keys:
+        if key in mapping and mapping[key] not in (None, ""):
+            return mapping[key]
+    return None
+
+class PriceTable:
+    """
+    Always-current in-memory table of the latest price per Helix market.
+
+    Keyed by pair symbol (e.g. "NEPT/INJ") like helix_data.json. Each entry is
+    [price, change_24h, volume, updated_at]; change and volume stay None until
+    a frame carries them. Frames that only name a market ID are resolved
+    through market_ids, which is seeded from helix_detailed_data.json and
+    extended whenever a frame carries both an ID and a ticker.
+    """
+
+    def __init__(self, market_ids=None):
+        self.prices = {}
+        self.market_ids = dict(market_ids or {})
+        self.update_count = 0
+
+    def update(self, symbol, price, change_24h=None, volume=None, updated_at=None):
+        entry = self.prices.get(symbol)
+        if entry is None:
+            entry = self.prices[symbol] = [None, None, None, None]
+        entry[0] = price
+        if change_24h is not None:
+            entry[1] = change_24h
+        if volume is not None:
+            entry[2] = volume
+        entry[3] = updated_at or time.time()
+        self.update_count += 1
+
+    def handle_frame(self, payload):
+        """Apply every price update found in one websocket frame; returns how many were applied"""
+        if isinstance(payload, bytes):
+            try:
+                payload = payload.decode("utf-8")
+            except UnicodeDecodeError:
+                return 0
+        try:
+            message = json.loads(payload)
+        except (TypeError, ValueError):
+            return 0
+
+        applied = 0
+        for symbol, price, change, volume in self._walk(message):
+            self.update(symbol, price, change, volume)
+            applied += 1
+        return applied
+
+    def _walk(self, node):
+        if isinstance(node, list):
+            for item in node:
+                yield from self._walk(item)
+        elif isinstance(node, dict):
+            symbol = _first(node, SYMBOL_KEYS)
+            market_id = _first(node, MARKET_ID_KEYS)
+            if isinstance(symbol, str) and isinstance(market_id, str):
+                self.market_ids[market_id] = symbol.upper()
+            if not isinstance(symbol, str) and isinstance(market_id, str):
+                symbol = self.market_ids.get(market_id)
+
+            price = _to_float(_first(node, PRICE_KEYS))
+            if isinstance(symbol, str) and "/" in symbol and price is not None:
+                yield (
+                    symbol.upper(),
+                    price,
+                    _to_float(_first(node, CHANGE_KEYS)),
+                    _to_float(_first(node, VOLUME_KEYS)),
+                )
+
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    yield from self._walk(value)
+
+    def write_snapshot(self, path=PRICE_SNAPSHOT_FILE):
+        """Atomically write the compact snapshot"""
+        snapshot = {
+            "timestamp": time.time(),
+            "fields": ["price", "change_24h", "volume", "updated_at"],
+            "prices": self.prices,
+        }
+        write_json_atomic(snapshot, path, separators=(",", ":"))
+
+def load_market_ids(path=HELIX_DETAILED_DATA_FILE):
+    """Market ID -> pair symbol from the detailed Helix data, if it has been scraped"""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {item["market_id"]: item["symbol"] for item in data.get("data", []) if item.get("market_id") and item.get("symbol")}
+
+def load_price_snapshot(path=PRICE_SNAPSHOT_FILE, max_age=PRICE_SNAPSHOT_MAX_AGE):
+    """Latest streamed prices as {pair_symbol: {price, change_24h, volume, updated_at}}, or {} if stale"""
+    try:
+        with open(path, "r") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if max_age is not None and time.time() - snapshot.get("timestamp", 0) > max_age:
+        logger.info(f"Price snapshot at {path} is older than {max_age}s, ignoring it")
+        return {}
+
+    fields = snapshot.get("fields", ["price", "change_24h", "volume", "updated_at"])
+    return {symbol: dict(zip(fields, values)) for symbol, values in snapshot.get("prices", {}).items()}
+
+class FrameRecorder:
+    """Record raw websocket frames as NDJSON so they can be replayed later"""
+
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+        self._start = time.time()
+
+    def record(self, payload):
+        if isinstance(payload, bytes):
+            line = {"t": time.time() - self._start, "encoding": "base64", "payload": base64.b64encode(payload).decode("ascii")}
+        else:
+            line = {"t": time.time() - self._start, "payload": payload}
+        self._file.write(json.dumps(line) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def load_recorded_frames(path):
+    """Yield (offset_seconds, payload) from a recorded frames file"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            payload = record["payload"]
+            if record.get("encoding") == "base64":
+                payload = base64.b64decode(payload)
+            yield record.get("t", 0), payload
+
+def replay_frames_into(table, path):
+    """Feed recorded frames straight into a PriceTable, without a browser or socket"""
+    applied = 0
+    for _, payload in load_recorded_frames(path):
+        applied += table.handle_frame(payload)
+    return applied
+
+async def stream_helix_prices(browser=None, url=HELIX_STREAM_URL, duration=None,
+                              snapshot_path=PRICE_SNAPSHOT_FILE, record_path=None, table=None):
+    """
+    Keep the Helix page open and build the price table from its websocket frames.
+
+    Snapshots are written every SNAPSHOT_INTERVAL seconds until duration runs
+    out (forever if None). The page is reopened if it crashes or is closed.
+    Returns the PriceTable.
+    """
+    from playwright.async_api import async_playwright
+
+    table = table or PriceTable(load_market_ids())
+    recorder = FrameRecorder(record_path) if record_path else None
+
+    def on_frame(payload):
+        if recorder:
+            recorder.record(payload)
+        table.handle_frame(payload)
+
+    def on_websocket(ws):
+        logger.info(f"Capturing market data from websocket {ws.url}")
+        ws.on("framereceived", on_frame)
+
+    async def open_page(context):
+        page = await context.new_page()
+        page.on("websocket", on_websocket)
+        logger.info(f"Opening {url} for price streaming")
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        return page
+
+    async def run(browser):
+        context = await browser.new_context(viewport={"width": 1280, "height": 800})
+        page = await open_page(context)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration if duration else None
+        try:
+            while deadline is None or loop.time() < deadline:
+                await asyncio.sleep(SNAPSHOT_INTERVAL if deadline is None else min(SNAPSHOT_INTERVAL, max(0, deadline - loop.time())))
+                if page.is_closed():
+                    logger.warning("Price stream page closed, reopening")
+                    page = await open_page(context)
+                table.write_snapshot(snapshot_path)
+                logger.info(f"Price snapshot: {len(table.prices)} markets, {table.update_count} updates so far")
+        finally:
+            table.write_snapshot(snapshot_path)
+            await context.close()
+            if recorder:
+                recorder.close()
+
+    if browser is not None:
+        await run(browser)
+        return table
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False, args=["--no-sandbox", "--disable-dev-shm-usage"])
+        try:
+            await run(browser)
+        finally:
+            await browser.close()
+    return table
+
+# Page served by the replay server; it just opens the websocket so the normal
+# page-capture path sees the frames exactly as it would on Helix
+REPLAY_PAGE = b"""<!doctype html>
+<html><body>Helix price stream replay
+<script>new WebSocket("ws://" + location.host + "/ws");</script>
+</body></html>
+"""
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+def _websocket_frame(payload):
+    """Encode an unmasked server-to-client websocket frame"""
+    if isinstance(payload, str):
+        opcode, data = 0x1, payload.encode("utf-8")
+    else:
+        opcode, data = 0x2, payload
+    header = bytes([0x80 | opcode])
+    length = len(data)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + length.to_bytes(2, "big")
+    else:
+        header += bytes([127]) + length.to_bytes(8, "big")
+    return header + data
+
+async def serve_replay(frames_path, host="127.0.0.1", port=8765, speed=1.0):
+    """
+    Local stand-in for Helix: serves a page whose websocket replays recorded frames.
+
+    Point HELIX_STREAM_URL (or --url) at http://host:port/ to exercise the
+    capture path end to end without touching the network.
+    """
+    frames = list(load_recorded_frames(frames_path))
+
+    async def handle(reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1] if len(lines[0].split(" ")) > 1 else "/"
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+            accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()).decode()
+            writer.write(
+                b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                + f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+            )
+            previous = 0
+            for offset, payload in frames:
+                await asyncio.sleep(max(0, offset - previous) / speed)
+                previous = offset
+                writer.write(_websocket_frame(payload))
+                await writer.drain()
+            logger.info(f"Replayed {len(frames)} frames")
+            # Keep the socket open like a live feed until the client goes away
+            await reader.read()
+        else:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: "
+                         + str(len(REPLAY_PAGE)).encode() + b"\r\nConnection: close\r\n\r\n" + REPLAY_PAGE)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Replaying {len(frames)} frames from {frames_path} on http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream live Helix prices into an in-memory table with periodic snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    capture_parser = subparsers.add_parser("capture", help="Keep the Helix page open and snapshot prices from its websocket frames")
+    capture_parser.add_argument("--url", default=HELIX_STREAM_URL)
+    capture_parser.add_argument("--duration", type=float, default=None, help="Seconds to run (default: forever)")
+    capture_parser.add_argument("--snapshot", default=PRICE_SNAPSHOT_FILE)
+    capture_parser.add_argument("--record", default=None, help="Also record raw frames to this NDJSON file")
+
+    replay_parser = subparsers.add_parser("replay", help="Apply recorded frames directly and write a snapshot")
+    replay_parser.add_argument("frames")
+    replay_parser.add_argument("--snapshot", default=PRICE_SNAPSHOT_FILE)
+
+    server_parser = subparsers.add_parser("replay-server", help="Serve recorded frames over a local websocket")
+    server_parser.add_argument("frames")
+    server_parser.add_argument("--host", default="127.0.0.1")
+    server_parser.add_argument("--port", type=int, default=8765)
+    server_parser.add_argument("--speed", type=float, default=1.0)
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # Configure logging
+    setup_logging("helix_price_stream")
+    args = parse_args(argv)
+
+    if args.command == "capture":
+        asyncio.run(stream_helix_prices(url=args.url, duration=args.duration,
+                                        snapshot_path=args.snapshot, record_path=args.record))
+    elif args.command == "replay":
+        table = PriceTable(load_market_ids())
+        applied = replay_frames_into(table, args.frames)
+        table.write_snapshot(args.snapshot)
+        logger.info(f"Applied {applied} updates for {len(table.prices)} markets to {args.snapshot}")
+    elif args.command == "replay-server":
+        try:
+            asyncio.run(serve_replay(args.frames, args.host, args.port, args.speed))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
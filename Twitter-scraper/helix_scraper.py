@@ -1,349 +1,601 @@
+import argparse
 import asyncio
 import json
 import logging
 import os
+import re
 import sys
 from datetime import datetime
 from playwright.async_api import async_playwright, TimeoutError
 
+from atomic_write import write_json_atomic
+from log_setup import setup_logging
+
 # Get the script's directory for relative file paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(SCRIPT_DIR, "helix_scraper.log")),
-        logging.StreamHandler()
-    ]
-)
+# Logging is configured by the entry point (see log_setup.setup_logging)
 logger = logging.getLogger("helix_scraper")
 
 # URL to scrape
 HELIX_URL = "https://helixapp.com/spot/inj-usdt"
 
-async def scrape_helix_inj_pairs():
+# Output files for the multi-market mode
+HELIX_DETAILED_DATA_FILE = os.path.join(SCRIPT_DIR, "helix_detailed_data.json")
+HELIX_MARKETS_FILE = os.path.join(SCRIPT_DIR, "helix_markets.json")
+
+# How long to keep polling the filtered market list, and how often
+RESULTS_WAIT_SECONDS = 3
+RESULTS_POLL_INTERVAL = 0.5
+
+# Market lists the multi-market mode can collect, each from its own page.
+# search is typed into the All Markets dropdown; perp selects derivatives.
+MARKET_FILTERS = {
+    "inj": {"search": "/INJ", "quote": "INJ", "perp": False},
+    "usdt": {"search": "/USDT", "quote": "USDT", "perp": False},
+    "perp": {"search": "PERP", "quote": "USDT", "perp": True},
+}
+DEFAULT_MARKETS = ("inj", "usdt", "perp")
+
+# Runs in the browser context and returns every pair for the given quote currently on the page
+EXTRACT_PAIRS_JS = r'''
+({quote, perp}) => {
+    // This function runs in the browser context
+    const cryptoData = [];
+    console.log("Browser context: Starting data extraction after search for", quote, perp ? "perpetuals" : "spot");
+    
+    // Spot pairs look like XXX/INJ, perpetuals like XXX/USDT PERP (case insensitive)
+    const pairPattern = new RegExp('([A-Z0-9]+)/' + quote + (perp ? '\\s*PERP' : '(?!\\s*PERP)'), 'i');
+    
+    // Function to process trading pair elements
+    function processPairElements(elements) {
+        elements.forEach(el => {
+            const text = el.textContent || '';
+            
+            const symbolMatch = text.match(pairPattern);
+            if (symbolMatch) {
+                // Ensure proper casing
+                const symbol = symbolMatch[1].toUpperCase() + '/' + quote + (perp ? ' PERP' : '');
+                console.log("Browser context: Found trading pair:", symbol);
+                
+                // Extract price, volume, and change data from the element's structure
+                // This assumes the data is in the element or its children
+                let price = 'N/A';
+                let volume = 'N/A';
+                let change_24h = 'N/A';
+                
+                // Look for price (typically a number with optional $ symbol)
+                const priceMatch = text.match(/[$]?([0-9,.]+)/);
+                if (priceMatch) {
+                    price = priceMatch[0];
+                }
+                
+                // Look for volume (typically a number followed by K, M, B)
+                const volumeMatch = text.match(/[$]?([0-9,.]+[KMB]?)/i);
+                if (volumeMatch && volumeMatch[0] !== price) {
+                    volume = volumeMatch[0];
+                }
+                
+                // Look for 24h change (typically a percentage with + or - sign)
+                const changeMatch = text.match(/([+-][0-9,.]+%)/);
+                if (changeMatch) {
+                    change_24h = changeMatch[0];
+                }
+                
+                // Add to our results
+                cryptoData.push({
+                    symbol: symbol,
+                    price: price,
+                    volume: volume,
+                    change_24h: change_24h,
+                    timestamp: new Date().toISOString()
+                });
+            }
+        });
+    }
+    
+    // Scenario 1: Look for trading pairs in a dropdown or popover
+    const dropdownElements = document.querySelectorAll('.dropdown-content li, .popover-content li, [role="listitem"]');
+    console.log("Browser context: Found dropdown/popover elements:", dropdownElements.length);
+    processPairElements(dropdownElements);
+    
+    // Scenario 2: Look for trading pairs in a table or list
+    const tableElements = document.querySelectorAll('tr, li, div[class*="row"], div[class*="item"]');
+    console.log("Browser context: Found table/list elements:", tableElements.length);
+    processPairElements(tableElements);
+    
+    // Scenario 3: General approach - look for any elements that might contain trading pairs
+    if (cryptoData.length === 0) {
+        console.log("Browser context: No trading pairs found in specific elements, trying general approach");
+        const allElements = document.querySelectorAll('*');
+        const potentialElements = Array.from(allElements).filter(el => {
+            const text = el.textContent || '';
+            return text.includes('/' + quote) && !text.includes('>') && !text.includes('<') && el.children.length === 0;
+        });
+        
+        console.log("Browser context: Found potential elements with /" + quote + ":", potentialElements.length);
+        processPairElements(potentialElements);
+    }
+    
+    console.log("Browser context: Total trading pairs found:", cryptoData.length);
+    return cryptoData;
+}
+'''
+
+def market_suffix(market):
+    """Symbol suffix of a market filter's pairs, e.g. /INJ or /USDT PERP"""
+    return f"/{market['quote']}" + (" PERP" if market['perp'] else "")
+
+def emit_new_pairs(cryptos, seen_symbols, on_pair=None, market=MARKET_FILTERS["inj"]):
+    """
+    Filter extracted pairs down to unseen symbols of the given market (/INJ by
+    default), report each one through on_pair and return them in discovery order
+    """
+    suffix = market_suffix(market)
+    new_pairs = []
+    for crypto in (cryptos or []):
+        symbol = crypto.get('symbol', '')
+        if symbol and symbol.endswith(suffix) and symbol not in seen_symbols:
+            seen_symbols.add(symbol)
+            new_pairs.append(crypto)
+            if on_pair:
+                on_pair(crypto)
+    return new_pairs
+
+def launch_options():
+    # Launch options with increased timeouts and more browser settings
+    return {
+        "headless": False,
+        "timeout": 60000,  # 60 seconds for browser launch
+        "args": [
+            "--disable-web-security",
+            "--disable-features=IsolateOrigins",
+            "--disable-site-isolation-trials",
+            "--no-sandbox",
+            "--disable-dev-shm-usage"
+        ]
+    }
+
+async def new_helix_context(browser):
+    # Create context with a larger viewport and longer timeout
+    context = await browser.new_context(
+        viewport={"width": 1280, "height": 800},
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    )
+    
+    # Set default timeout for all operations to 60 seconds
+    context.set_default_timeout(60000)
+    return context
+
+async def scrape_helix_inj_pairs(browser=None, on_pair=None):
     """
     Scrape cryptocurrency data from Helix App for pairs ending with /INJ
+
+    If a browser is given it is shared with the caller and left open; otherwise
+    a dedicated browser is launched and closed when scraping finishes.
+    on_pair, if given, is called with each unique /INJ pair as soon as it
+    shows up in the search results, before the full scrape has finished.
     """
     logger.info("Starting Helix scraper for /INJ pairs")
     
+    if browser is not None:
+        return await scrape_helix_with_browser(browser, on_pair)
+    
     async with async_playwright() as p:
-        # Launch options with increased timeouts and more browser settings
-        browser_launch_options = {
-            "headless": False,
-            "timeout": 60000,  # 60 seconds for browser launch
-            "args": [
-                "--disable-web-security",
-                "--disable-features=IsolateOrigins",
-                "--disable-site-isolation-trials",
-                "--no-sandbox",
-                "--disable-dev-shm-usage"
-            ]
-        }
-        
+        browser_launch_options = launch_options()
         logger.info("Launching browser with options: %s", browser_launch_options)
         browser = await p.chromium.launch(**browser_launch_options)
         
-        # Create context with a larger viewport and longer timeout
-        context = await browser.new_context(
-            viewport={"width": 1280, "height": 800},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        
-        # Set default timeout for all operations to 60 seconds
-        context.set_default_timeout(60000)
-        
-        page = await context.new_page()
+        try:
+            return await scrape_helix_with_browser(browser, on_pair)
+        finally:
+            await browser.close()
+
+async def open_market_search(page, search_text):
+    """Load Helix, open the All Markets dropdown and filter it by search_text"""
+    # Navigate to the Helix App with a longer timeout
+    logger.info(f"Navigating to {HELIX_URL}")
+    await page.goto(HELIX_URL, timeout=60000, wait_until="domcontentloaded")
+    
+    # Wait for page to load with a longer timeout and more specific approach
+    logger.info("Waiting for page to load...")
+    
+    try:
+        # Try waiting for specific elements first that would indicate the page is loaded
+        await page.wait_for_selector("body", timeout=10000)
+        logger.info("Body element found, waiting for more content...")
         
+        # Try with a more flexible approach
         try:
-            # Navigate to the Helix App with a longer timeout
-            logger.info(f"Navigating to {HELIX_URL}")
-            await page.goto(HELIX_URL, timeout=60000, wait_until="domcontentloaded")
-            
-            # Wait for page to load with a longer timeout and more specific approach
-            logger.info("Waiting for page to load...")
+            await page.wait_for_load_state("networkidle", timeout=60000)
+            logger.info("Network idle state reached")
+        except TimeoutError:
+            logger.warning("Network idle timeout reached, continuing anyway as page might still be usable")
+    except TimeoutError as e:
+        logger.warning(f"Timeout while waiting for page elements: {e}")
+        logger.info("Continuing anyway as page might still be partially loaded")
+    
+    # Give extra time for dynamic content to load
+    logger.info("Waiting additional time for dynamic content to load...")
+    await asyncio.sleep(10)
+    
+    # Click on the "All Markets" dropdown button
+    logger.info("Looking for 'All Markets' dropdown button...")
+    
+    # Try multiple selectors that might match the "All Markets" dropdown
+    all_markets_selectors = [
+        "text=All Markets",
+        "[aria-label='All Markets']",
+        "button:has-text('All Markets')",
+        "div:has-text('All Markets'):not(:has(*))",
+        "//button[contains(., 'All Markets')]",
+        "//div[contains(., 'All Markets') and not(child::*)]"
+    ]
+    
+    clicked = False
+    for selector in all_markets_selectors:
+        try:
+            logger.info(f"Trying to click using selector: {selector}")
+            # Wait for the element to be visible and clickable
+            await page.wait_for_selector(selector, state="visible", timeout=5000)
+            await page.click(selector)
+            logger.info(f"Successfully clicked 'All Markets' using selector: {selector}")
+            clicked = True
+            break
+        except Exception as e:
+            logger.warning(f"Failed to click with selector '{selector}': {e}")
+    
+    if not clicked:
+        logger.warning("Could not click on 'All Markets' dropdown using predefined selectors")
+        logger.info("Trying to find and click based on visual content...")
+        
+        # Try to find and click the element by analyzing the page content
+        dropdown_element = await page.evaluate('''
+        () => {
+            // Find elements containing "All Markets" text
+            const elements = Array.from(document.querySelectorAll('*'))
+                .filter(el => el.textContent.trim() === 'All Markets');
             
+            if (elements.length > 0) {
+                // Get coordinates for click
+                const rect = elements[0].getBoundingClientRect();
+                return {
+                    x: rect.x + rect.width / 2,
+                    y: rect.y + rect.height / 2,
+                    found: true
+                };
+            }
+            return { found: false };
+        }
+        ''')
+        
+        if dropdown_element and dropdown_element.get('found'):
+            logger.info(f"Found 'All Markets' element via content analysis, clicking at coordinates: {dropdown_element.get('x')}, {dropdown_element.get('y')}")
+            await page.mouse.click(dropdown_element.get('x'), dropdown_element.get('y'))
+            clicked = True
+        else:
+            logger.warning("Could not find 'All Markets' element via content analysis")
+    
+    # Wait for dropdown to appear and search for the market filter
+    if clicked:
+        logger.info("Waiting for dropdown to appear...")
+        await asyncio.sleep(2)
+        
+        # Look for a search input in the dropdown
+        search_selectors = [
+            "input[placeholder*='Search']",
+            "input[type='text']",
+            "input",
+            "[role='searchbox']",
+            "[aria-label='Search']"
+        ]
+        
+        search_input_found = False
+        for selector in search_selectors:
             try:
-                # Try waiting for specific elements first that would indicate the page is loaded
-                await page.wait_for_selector("body", timeout=10000)
-                logger.info("Body element found, waiting for more content...")
-                
-                # Try with a more flexible approach
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=60000)
-                    logger.info("Network idle state reached")
-                except TimeoutError:
-                    logger.warning("Network idle timeout reached, continuing anyway as page might still be usable")
-            except TimeoutError as e:
-                logger.warning(f"Timeout while waiting for page elements: {e}")
-                logger.info("Continuing anyway as page might still be partially loaded")
-            
-            # Give extra time for dynamic content to load
-            logger.info("Waiting additional time for dynamic content to load...")
-            await asyncio.sleep(10)
-            
-            # Click on the "All Markets" dropdown button
-            logger.info("Looking for 'All Markets' dropdown button...")
-            
-            # Try multiple selectors that might match the "All Markets" dropdown
-            all_markets_selectors = [
-                "text=All Markets",
-                "[aria-label='All Markets']",
-                "button:has-text('All Markets')",
-                "div:has-text('All Markets'):not(:has(*))",
-                "//button[contains(., 'All Markets')]",
-                "//div[contains(., 'All Markets') and not(child::*)]"
-            ]
-            
-            clicked = False
-            for selector in all_markets_selectors:
-                try:
-                    logger.info(f"Trying to click using selector: {selector}")
-                    # Wait for the element to be visible and clickable
-                    await page.wait_for_selector(selector, state="visible", timeout=5000)
-                    await page.click(selector)
-                    logger.info(f"Successfully clicked 'All Markets' using selector: {selector}")
-                    clicked = True
+                logger.info(f"Looking for search input with selector: {selector}")
+                search_input = await page.wait_for_selector(selector, state="visible", timeout=5000)
+                if search_input:
+                    logger.info(f"Found search input using selector: {selector}")
+                    # Type the market filter (e.g. "/INJ") in the search input
+                    await search_input.fill(search_text)
+                    logger.info(f"Entered '{search_text}' in search input")
+                    await asyncio.sleep(2)  # Wait for search results
+                    search_input_found = True
                     break
-                except Exception as e:
-                    logger.warning(f"Failed to click with selector '{selector}': {e}")
-            
-            if not clicked:
-                logger.warning("Could not click on 'All Markets' dropdown using predefined selectors")
-                logger.info("Trying to find and click based on visual content...")
-                
-                # Try to find and click the element by analyzing the page content
-                dropdown_element = await page.evaluate('''
-                () => {
-                    // Find elements containing "All Markets" text
-                    const elements = Array.from(document.querySelectorAll('*'))
-                        .filter(el => el.textContent.trim() === 'All Markets');
-                    
-                    if (elements.length > 0) {
-                        // Get coordinates for click
-                        const rect = elements[0].getBoundingClientRect();
-                        return {
-                            x: rect.x + rect.width / 2,
-                            y: rect.y + rect.height / 2,
-                            found: true
-                        };
-                    }
-                    return { found: false };
-                }
-                ''')
-                
-                if dropdown_element and dropdown_element.get('found'):
-                    logger.info(f"Found 'All Markets' element via content analysis, clicking at coordinates: {dropdown_element.get('x')}, {dropdown_element.get('y')}")
-                    await page.mouse.click(dropdown_element.get('x'), dropdown_element.get('y'))
-                    clicked = True
-                else:
-                    logger.warning("Could not find 'All Markets' element via content analysis")
-            
-            # Wait for dropdown to appear and search for "/INJ"
-            if clicked:
-                logger.info("Waiting for dropdown to appear...")
-                await asyncio.sleep(2)
-                
-                # Look for a search input in the dropdown
-                search_selectors = [
-                    "input[placeholder*='Search']",
-                    "input[type='text']",
-                    "input",
-                    "[role='searchbox']",
-                    "[aria-label='Search']"
-                ]
-                
-                search_input_found = False
-                for selector in search_selectors:
-                    try:
-                        logger.info(f"Looking for search input with selector: {selector}")
-                        search_input = await page.wait_for_selector(selector, state="visible", timeout=5000)
-                        if search_input:
-                            logger.info(f"Found search input using selector: {selector}")
-                            # Type "/INJ" in the search input
-                            await search_input.fill("/INJ")
-                            logger.info("Entered '/INJ' in search input")
-                            await asyncio.sleep(2)  # Wait for search results
-                            search_input_found = True
-                            break
-                    except Exception as e:
-                        logger.warning(f"Failed to find or fill search input with selector '{selector}': {e}")
-                
-                if not search_input_found:
-                    logger.warning("Could not find search input in dropdown")
-            
-            # Wait for search results
-            logger.info("Waiting for search results to load...")
-            await asyncio.sleep(3)
-            
-            # Extract cryptocurrency data
-            logger.info("Extracting cryptocurrency data from search results...")
-            
-            cryptos = await page.evaluate('''
-            () => {
-                // This function runs in the browser context
-                const cryptoData = [];
-                console.log("Browser context: Starting data extraction after search");
-                
-                // Function to process trading pair elements
-                function processPairElements(elements) {
-                    elements.forEach(el => {
-                        const text = el.textContent || '';
-                        
-                        // Look for patterns like XXX/INJ or XXX/inj (case insensitive)
-                        const symbolMatch = text.match(/([A-Z0-9]+)\/INJ/i);
-                        if (symbolMatch) {
-                            const symbol = symbolMatch[0].toUpperCase(); // Ensure proper casing
-                            console.log("Browser context: Found trading pair:", symbol);
-                            
-                            // Extract price, volume, and change data from the element's structure
-                            // This assumes the data is in the element or its children
-                            let price = 'N/A';
-                            let volume = 'N/A';
-                            let change_24h = 'N/A';
-                            
-                            // Look for price (typically a number with optional $ symbol)
-                            const priceMatch = text.match(/[$]?([0-9,.]+)/);
-                            if (priceMatch) {
-                                price = priceMatch[0];
-                            }
-                            
-                            // Look for volume (typically a number followed by K, M, B)
-                            const volumeMatch = text.match(/[$]?([0-9,.]+[KMB]?)/i);
-                            if (volumeMatch && volumeMatch[0] !== price) {
-                                volume = volumeMatch[0];
-                            }
-                            
-                            // Look for 24h change (typically a percentage with + or - sign)
-                            const changeMatch = text.match(/([+-][0-9,.]+%)/);
-                            if (changeMatch) {
-                                change_24h = changeMatch[0];
-                            }
-                            
-                            // Add to our results
-                            cryptoData.push({
-                                symbol: symbol,
-                                price: price,
-                                volume: volume,
-                                change_24h: change_24h,
-                                timestamp: new Date().toISOString()
-                            });
-                        }
-                    });
-                }
-                
-                // Scenario 1: Look for trading pairs in a dropdown or popover
-                const dropdownElements = document.querySelectorAll('.dropdown-content li, .popover-content li, [role="listitem"]');
-                console.log("Browser context: Found dropdown/popover elements:", dropdownElements.length);
-                processPairElements(dropdownElements);
-                
-                // Scenario 2: Look for trading pairs in a table or list
-                const tableElements = document.querySelectorAll('tr, li, div[class*="row"], div[class*="item"]');
-                console.log("Browser context: Found table/list elements:", tableElements.length);
-                processPairElements(tableElements);
-                
-                // Scenario 3: General approach - look for any elements that might contain trading pairs
-                if (cryptoData.length === 0) {
-                    console.log("Browser context: No trading pairs found in specific elements, trying general approach");
-                    const allElements = document.querySelectorAll('*');
-                    const potentialElements = Array.from(allElements).filter(el => {
-                        const text = el.textContent || '';
-                        return text.includes('/INJ') && !text.includes('>') && !text.includes('<') && el.children.length === 0;
-                    });
-                    
-                    console.log("Browser context: Found potential elements with /INJ:", potentialElements.length);
-                    processPairElements(potentialElements);
-                }
-                
-                console.log("Browser context: Total trading pairs found:", cryptoData.length);
-                return cryptoData;
-            }
-            ''')
-            
-            logger.info(f"Extracted {len(cryptos) if cryptos else 0} cryptocurrency pairs from page")
-            
-            # If we didn't find data with the initial extraction, try an alternative approach
-            if not cryptos:
-                logger.info("Initial extraction didn't yield results, trying alternative approach")
-                
-                # Save the HTML for analysis
-                html_content = await page.content()
-                html_path = os.path.join(SCRIPT_DIR, "helix_page.html")
-                with open(html_path, "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                logger.info(f"Page HTML saved to {html_path}")
-                
-                # Try to extract using regex pattern matching on the HTML
-                logger.info("Trying regex pattern matching on HTML content")
-                
-                def extract_inj_pairs(html):
-                    import re
-                    # Pattern to find cryptocurrency pairs ending with /INJ
-                    pattern = r'([A-Z0-9]+)/INJ'
-                    matches = re.findall(pattern, html)
-                    
-                    results = []
-                    seen = set()
-                    for match in matches:
-                        pair = f"{match}/INJ"
-                        if pair not in seen:
-                            seen.add(pair)
-                            logger.info(f"Found trading pair via regex: {pair}")
-                            results.append({
-                                "symbol": pair,
-                                "price": "N/A",
-                                "volume": "N/A",
-                                "change_24h": "N/A",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                    return results
-                
-                cryptos = extract_inj_pairs(html_content)
-                logger.info(f"Regex extraction found {len(cryptos)} trading pairs")
-            
-            # Filter data to ensure we only have /INJ pairs and remove duplicates
-            inj_cryptos = []
-            seen_symbols = set()
-            
-            for crypto in (cryptos or []):
-                symbol = crypto.get('symbol', '')
-                if symbol and symbol.endswith('/INJ') and symbol not in seen_symbols:
-                    seen_symbols.add(symbol)
-                    inj_cryptos.append(crypto)
-            
-            logger.info(f"Found {len(inj_cryptos)} unique cryptocurrency pairs ending with /INJ")
-            
-            # Add timestamp and source information
-            result = {
-                "data": inj_cryptos,
-                "metadata": {
-                    "source": HELIX_URL,
-                    "timestamp": datetime.now().isoformat(),
-                    "count": len(inj_cryptos)
-                }
-            }
-            
-            # Save the data to a JSON file
-            json_path = os.path.join(SCRIPT_DIR, "helix_data.json")
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2)
-            
-            logger.info(f"Data saved to {json_path}")
-            await browser.close()
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error during scraping: {e}", exc_info=True)
-            await browser.close()
-            raise
+            except Exception as e:
+                logger.warning(f"Failed to find or fill search input with selector '{selector}': {e}")
+        
+        if not search_input_found:
+            logger.warning("Could not find search input in dropdown")
+
+async def collect_market_pairs(page, market, on_pair=None, html_name="helix_page.html"):
+    """
+    Poll the filtered market list on page and return the unique pairs of market,
+    streaming each one through on_pair as soon as it appears instead of waiting
+    for the full result set. Falls back to a regex over the page HTML.
+    """
+    logger.info("Waiting for search results to load...")
+    logger.info("Extracting cryptocurrency data from search results...")
+    
+    cryptos = []
+    seen_symbols = set()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + RESULTS_WAIT_SECONDS
+    js_args = {"quote": market['quote'], "perp": market['perp']}
+    while True:
+        found = await page.evaluate(EXTRACT_PAIRS_JS, js_args)
+        cryptos.extend(emit_new_pairs(found, seen_symbols, on_pair, market))
+        if loop.time() >= deadline:
+            break
+        await asyncio.sleep(RESULTS_POLL_INTERVAL)
+    
+    logger.info(f"Extracted {len(cryptos)} {market_suffix(market)} pairs from page")
+    
+    # If we didn't find data with the initial extraction, try an alternative approach
+    if not cryptos:
+        logger.info("Initial extraction didn't yield results, trying alternative approach")
+        
+        # Save the HTML for analysis
+        html_content = await page.content()
+        html_path = os.path.join(SCRIPT_DIR, html_name)
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+        logger.info(f"Page HTML saved to {html_path}")
+        
+        # Try to extract using regex pattern matching on the HTML
+        logger.info("Trying regex pattern matching on HTML content")
+        cryptos = emit_new_pairs(extract_pairs_from_html(html_content, market), seen_symbols, on_pair, market)
+        logger.info(f"Regex extraction found {len(cryptos)} trading pairs")
+    
+    return cryptos
+
+def extract_pairs_from_html(html, market):
+    """Find the market's trading pairs in raw page HTML, without price data"""
+    suffix = r'\s*PERP' if market['perp'] else r'(?!\s*PERP)'
+    pattern = rf"([A-Z0-9]+)/{market['quote']}{suffix}"
+    
+    results = []
+    seen = set()
+    for match in re.findall(pattern, html):
+        pair = f"{match}{market_suffix(market)}"
+        if pair not in seen:
+            seen.add(pair)
+            logger.info(f"Found trading pair via regex: {pair}")
+            results.append({
+                "symbol": pair,
+                "price": "N/A",
+                "volume": "N/A",
+                "change_24h": "N/A",
+                "timestamp": datetime.now().isoformat()
+            })
+    return results
+
+def save_inj_pairs(inj_cryptos, path=os.path.join(SCRIPT_DIR, "helix_data.json")):
+    """Write the /INJ pairs to helix_data.json, the Twitter scraper's input"""
+    # Add timestamp and source information
+    result = {
+        "data": inj_cryptos,
+        "metadata": {
+            "source": HELIX_URL,
+            "timestamp": datetime.now().isoformat(),
+            "count": len(inj_cryptos)
+        }
+    }
+    
+    # Save the data to a JSON file
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    
+    logger.info(f"Data saved to {path}")
+    return result
+
+async def scrape_helix_with_browser(browser, on_pair=None):
+    """Run the Helix scrape in a new context of an already launched browser"""
+    context = await new_helix_context(browser)
+    page = await context.new_page()
+    
+    try:
+        await open_market_search(page, "/INJ")
+        
+        # emit_new_pairs has already filtered to unique /INJ pairs
+        inj_cryptos = await collect_market_pairs(page, MARKET_FILTERS["inj"], on_pair)
+        logger.info(f"Found {len(inj_cryptos)} unique cryptocurrency pairs ending with /INJ")
+        
+        return save_inj_pairs(inj_cryptos)
+        
+    except Exception as e:
+        logger.error(f"Error during scraping: {e}", exc_info=True)
+        raise
+    finally:
+        await context.close()
+
+def parse_amount(value):
+    """Parse a scraped number such as "$1.2M", "16,183.328 INJ" or "+0.08%"; None if missing"""
+    if not isinstance(value, str):
+        return float(value) if isinstance(value, (int, float)) else None
+    match = re.search(r'([-+]?[\d,]*\.?\d+)\s*([KMB])?', value, re.IGNORECASE)
+    if not match:
+        return None
+    try:
+        number = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+    multiplier = {"K": 1e3, "M": 1e6, "B": 1e9}.get((match.group(2) or "").upper(), 1)
+    return number * multiplier
+
+def helix_link(symbol):
+    """Helix trading page for a pair, e.g. NEPT/INJ -> /spot/nept-inj, BTC/USDT PERP -> /futures/btc-usdt-perp"""
+    base, _, rest = symbol.partition('/')
+    quote, _, kind = rest.partition(' ')
+    if kind == "PERP":
+        return f"https://helixapp.com/futures/{base.lower()}-{quote.lower()}-perp"
+    return f"https://helixapp.com/spot/{base.lower()}-{quote.lower()}"
+
+def build_symbol_index(markets):
+    """
+    Merge the pairs of every scraped market by base asset.
+
+    Returns {base: {markets, best_price_usdt, total_volume_usdt}}. Prices and
+    volumes are converted to USDT, using the INJ/USDT market for INJ-quoted
+    pairs; the best price is taken from the base's most liquid market, so a
+    stale quote on a thin pair can't win. Markets whose values can't be
+    converted keep their raw fields and are left out of the totals.
+    """
+    inj_usdt = None
+    for crypto in markets.get("usdt", []):
+        if crypto['symbol'] == "INJ/USDT":
+            inj_usdt = parse_amount(crypto.get('price'))
+    to_usdt = {"USDT": 1.0, "INJ": inj_usdt}
+    
+    index = {}
+    for name, cryptos in markets.items():
+        market = MARKET_FILTERS[name]
+        for crypto in cryptos:
+            base = crypto['symbol'].split('/')[0]
+            rate = to_usdt.get(market['quote'])
+            price = parse_amount(crypto.get('price'))
+            volume = parse_amount(crypto.get('volume'))
+            entry = index.setdefault(base, {"markets": [], "best_price_usdt": None, "total_volume_usdt": 0.0})
+            entry["markets"].append({
+                "symbol": crypto['symbol'],
+                "type": "perp" if market['perp'] else "spot",
+                "quote": market['quote'],
+                "price": price,
+                "volume": volume,
+                "change_24h": parse_amount(crypto.get('change_24h')),
+                "price_usdt": price * rate if price is not None and rate else None,
+                "volume_usdt": volume * rate if volume is not None and rate else None,
+            })
+    
+    for entry in index.values():
+        priced = [m for m in entry["markets"] if m["price_usdt"]]
+        entry["total_volume_usdt"] = sum(m["volume_usdt"] or 0.0 for m in entry["markets"])
+        if priced:
+            deepest = max(priced, key=lambda m: m["volume_usdt"] or 0.0)
+            entry["best_price_usdt"] = deepest["price_usdt"]
+    return index
+
+def merge_detailed_data(cryptos, path=HELIX_DETAILED_DATA_FILE):
+    """
+    /INJ pair records in the helix_detailed_data.json schema the frontend reads.
+    Fields only the detailed scrape provides (market_id, tick size, ...) are kept
+    from the existing file for markets it already knows; price, change and
+    volume come from this scrape.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            known = {item['symbol']: item for item in json.load(f).get("data", []) if item.get('symbol')}
+    except (OSError, ValueError):
+        known = {}
+    
+    detailed = []
+    for crypto in cryptos:
+        record = dict(known.get(crypto['symbol'], {}))
+        record.update(crypto)
+        # A fresh volume always replaces the stored one; keep the old value only
+        # when this scrape couldn't read it
+        volume = crypto.get("volume", "N/A")
+        if volume != "N/A" or "volume_24h" not in record:
+            record["volume_24h"] = volume
+        record.setdefault("helix_link", helix_link(crypto['symbol']))
+        detailed.append(record)
+    return detailed
+
+async def scrape_market(context, name, on_pair=None):
+    """Scrape one market filter on its own page of a shared context"""
+    market = MARKET_FILTERS[name]
+    page = await context.new_page()
+    try:
+        logger.info(f"Scraping {market_suffix(market)} markets")
+        await open_market_search(page, market['search'])
+        html_name = "helix_page.html" if name == "inj" else f"helix_page_{name}.html"
+        return await collect_market_pairs(page, market, on_pair, html_name)
+    finally:
+        await page.close()
+
+async def scrape_helix_markets(browser=None, names=DEFAULT_MARKETS, on_pair=None):
+    """
+    Scrape several Helix market lists concurrently, one page each.
+
+    Writes the helix_markets.json symbol index over every scraped list and
+    returns it. The /INJ pairs also go to helix_data.json and
+    helix_detailed_data.json as before; those files are left untouched if the
+    /INJ list fails. A market list that fails is logged and skipped so the
+    others still land.
+    """
+    logger.info(f"Starting multi-market Helix scrape for: {', '.join(names)}")
+    
+    if browser is None:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(**launch_options())
+            try:
+                return await scrape_helix_markets(browser, names, on_pair)
+            finally:
+                await browser.close()
+    
+    context = await new_helix_context(browser)
+    try:
+        scraped = await asyncio.gather(
+            *(scrape_market(context, name, on_pair) for name in names),
+            return_exceptions=True,
+        )
+    finally:
+        await context.close()
+    
+    markets = {}
+    for name, result in zip(names, scraped):
+        if isinstance(result, Exception):
+            logger.error(f"Scraping {name} markets failed: {result}")
+            continue
+        markets[name] = result
+    if not markets:
+        raise RuntimeError("Every Helix market list failed to scrape")
+    
+    timestamp = datetime.now().isoformat()
+    if "inj" in markets:
+        save_inj_pairs(markets["inj"])
+        # The frontend lists these records by base symbol, so other quote
+        # currencies only go to helix_markets.json
+        detailed = merge_detailed_data(markets["inj"])
+        write_json_atomic({"data": detailed, "metadata": {"timestamp": timestamp, "count": len(detailed)}},
+                          HELIX_DETAILED_DATA_FILE, indent=2)
+    
+    index = build_symbol_index(markets)
+    write_json_atomic({
+        "symbols": index,
+        "metadata": {
+            "markets": {name: len(cryptos) for name, cryptos in markets.items()},
+            "timestamp": timestamp,
+            "count": len(index),
+        },
+    }, HELIX_MARKETS_FILE, indent=2)
+    
+    market_count = sum(len(cryptos) for cryptos in markets.values())
+    logger.info(f"Indexed {len(index)} base assets across {market_count} markets")
+    return index
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape trading pairs from Helix")
+    parser.add_argument("--markets", help=f"comma-separated market lists to collect concurrently ({', '.join(MARKET_FILTERS)}); "
+                                          "without it only /INJ pairs are scraped")
+    return parser.parse_args(argv)
 
-async def main():
+async def main(argv=None):
+    args = parse_args(argv)
+    setup_logging("helix_scraper")
     try:
-        result = await scrape_helix_inj_pairs()
-        logger.info(f"Successfully scraped {len(result['data'])} INJ pairs")
+        if args.markets:
+            names = [name.strip().lower() for name in args.markets.split(",") if name.strip()]
+            unknown = [name for name in names if name not in MARKET_FILTERS]
+            if unknown:
+                logger.error(f"Unknown market list(s): {', '.join(unknown)}")
+                return 2
+            index = await scrape_helix_markets(names=names)
+            logger.info(f"Successfully scraped {len(index)} base assets")
+        else:
+            result = await scrape_helix_inj_pairs()
+            logger.info(f"Successfully scraped {len(result['data'])} INJ pairs")
     except Exception as e:
         logger.error(f"Error in Helix scraper: {e}", exc_info=True)
         return 1
@@ -351,4 +603,4 @@ async def main():
 
 if __name__ == "__main__":
     exit_code = asyncio.run(main())
-    sys.exit(exit_code) 
\ No newline at end of file
+    sys.exit(exit_code)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from atomic_write import write_json_atomic
+
+logger = logging.getLogger("leaderboard")
+
+# Get the script's directory for relative file paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Partial rankings published while a run is in progress
+LEADERBOARD_FILE = os.path.join(SCRIPT_DIR, "coin_leaderboard.json")
+# Seconds between leaderboard writes while coins are still arriving
+PUBLISH_INTERVAL = 5.0
+
+class Leaderboard:
+    """
+    Ranking of coins by investment score, kept up to date one coin at a time.
+
+    Scores live in a dict next to a list of (sentiment_missing, -score, symbol)
+    keys that is kept sorted with bisect, so adding or re-scoring a coin costs a
+    binary search and an insert rather than a full sort, and the top K is just a
+    slice. Coins without a sentiment analysis rank below every coin that has
+    one. version goes up on every change.
+    """
+
+    def __init__(self, size=10):
+        self.size = size
+        self.version = 0
+        self._records = {}
+        self._order = []
+
+    def _key(self, record):
+        return (record.get('sentiment_missing', False), -record['investment_score'], record['symbol'])
+
+    def _remove_key(self, symbol):
+        record = self._records.pop(symbol, None)
+        if record is None:
+            return None
+        key = self._key(record)
+        index = bisect_left(self._order, key)
+        del self._order[index]
+        return index
+
+    def update(self, record):
+        """Add or re-score a coin; returns True if the top K changed"""
+        old_rank = self._remove_key(record['symbol'])
+        self._records[record['symbol']] = record
+        key = self._key(record)
+        insort(self._order, key)
+        self.version += 1
+
+        new_rank = bisect_left(self._order, key)
+        return new_rank < self.size or (old_rank is not None and old_rank < self.size)
+
+    def discard(self, symbol):
+        """Drop a coin from the ranking; returns True if it was in the top K"""
+        rank = self._remove_key(symbol)
+        if rank is None:
+            return False
+        self.version += 1
+        return rank < self.size
+
+    def rank(self, symbol):
+        """Zero-based position of a coin, or None if it isn't ranked"""
+        record = self._records.get(symbol)
+        if record is None:
+            return None
+        return bisect_left(self._order, self._key(record))
+
+    def top(self, n=None):
+        n = self.size if n is None else n
+        return [self._records[key[-1]] for key in self._order[:n]]
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, symbol):
+        return symbol in self._records
+
+class LeaderboardPublisher:
+    """
+    Writes versioned snapshots of a Leaderboard for consumers to poll mid-run.
+
+    A change to the top K is written straight away unless the last write was
+    less than interval seconds ago, in which case it is held back and flushed by
+    run() once the interval has passed. Each snapshot carries the leaderboard
+    version and a complete flag that is only set by the final publish.
+    """
+
+    def __init__(self, leaderboard=None, path=LEADERBOARD_FILE, interval=PUBLISH_INTERVAL, total=None):
+        self.leaderboard = leaderboard or Leaderboard()
+        self.path = path
+        self.interval = interval
+        self.total = total
+        self._last_publish = 0.0
+        self._pending = False
+
+    def update(self, record):
+        """Score a coin into the leaderboard and publish if the top K moved"""
+        if self.leaderboard.update(record):
+            self._pending = True
+            self.maybe_publish()
+
+    def maybe_publish(self):
+        if self._pending and time.monotonic() - self._last_publish >= self.interval:
+            self.publish()
+
+    def publish(self, complete=False):
+        """Atomically write the current top K so readers never see a partial file"""
+        leaderboard = self.leaderboard
+        snapshot = {
+            "version": leaderboard.version,
+            "complete": complete,
+            "coins_scored": len(leaderboard),
+            "coins_total": self.total,
+            "updated_at": datetime.now().isoformat(),
+            "top_investment_coins": leaderboard.top(),
+        }
+        try:
+            write_json_atomic(snapshot, self.path, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Error publishing leaderboard: {e}")
+            return
+
+        self._last_publish = time.monotonic()
+        self._pending = False
+        state = "final" if complete else "partial"
+        logger.info(f"Published {state} leaderboard v{leaderboard.version} ({len(leaderboard)} coins scored)")
+
+    async def run(self):
+        """Flush held-back changes every interval until cancelled"""
+        while True:
+            await asyncio.sleep(self.interval)
+            self.maybe_publish()
@@ -0,0 +1,215 @@
+import atexit
+import contextlib
+import contextvars
+import copy
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import metrics
+
+# Get the script's directory for relative file paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Every entry point writes its own rotating log here
+LOG_DIR = os.path.join(SCRIPT_DIR, "logs")
+# Roll the log over once it reaches this size or this age, whichever comes first
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATE_SECONDS = 24 * 60 * 60
+# Compressed rotations kept per log; older ones are deleted
+LOG_BACKUP_COUNT = 14
+# Set to 1 to log synchronously from the caller, e.g. to compare log_emit_ms
+LOG_SYNC = os.getenv("SCRAPER_LOG_SYNC", "0") == "1"
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Which coin and pipeline stage the current task is working on, stamped onto every record
+current_coin = contextvars.ContextVar("current_coin", default=None)
+current_stage = contextvars.ContextVar("current_stage", default=None)
+
+_listener = None
+
+@contextlib.contextmanager
+def log_context(coin=None, stage=None):
+    """Tag log records emitted inside the block (by this task only) with a coin and/or stage"""
+    tokens = []
+    if coin is not None:
+        tokens.append((current_coin, current_coin.set(coin)))
+    if stage is not None:
+        tokens.append((current_stage, current_stage.set(stage)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+class ContextFilter(logging.Filter):
+    """Copy the coin/stage context onto the record while still in the logging task"""
+
+    def filter(self, record):
+        record.coin = current_coin.get()
+        record.stage = current_stage.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the context fields broken out for log tooling"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "coin": getattr(record, "coin", None),
+            "stage": getattr(record, "stage", None),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class CompressingRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """
+    Rotate a log file when it passes max_bytes or when a new interval starts,
+    gzip the rotated file and keep only the newest backup_count.
+
+    Intervals are aligned to local midnight rather than to process start, so
+    short scheduled runs that reopen the same log still rotate it daily. Meant
+    to sit behind the queue listener, so compression never runs on the event loop.
+    """
+
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, interval=LOG_ROTATE_SECONDS,
+                 backup_count=LOG_BACKUP_COUNT):
+        super().__init__(filename, "a", encoding="utf-8")
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+
+        now = time.time()
+        period_start = self._period_start(now)
+        self.rollover_at = period_start + interval
+        if os.path.getsize(self.baseFilename) and os.path.getmtime(self.baseFilename) < period_start:
+            # Left over from an earlier interval; rotate on the first record
+            self.rollover_at = now
+
+    def _period_start(self, now):
+        return now - ((now + time.localtime(now).tm_gmtoff) % self.interval)
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at:
+            return True
+        return bool(self.max_bytes and self.stream is not None and self.stream.tell() >= self.max_bytes)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = f"{self.baseFilename}.{stamp}.gz"
+        suffix = 1
+        while os.path.exists(target):
+            target = f"{self.baseFilename}.{stamp}-{suffix}.gz"
+            suffix += 1
+
+        if os.path.exists(self.baseFilename):
+            with open(self.baseFilename, "rb") as source, gzip.open(target, "wb") as dest:
+                shutil.copyfileobj(source, dest)
+            os.remove(self.baseFilename)
+
+        backups = sorted(glob.glob(f"{glob.escape(self.baseFilename)}.*.gz"), key=os.path.getmtime)
+        for old in backups[:-self.backup_count] if self.backup_count else []:
+            os.remove(old)
+
+        self.stream = self._open()
+        self.rollover_at = self._period_start(time.time()) + self.interval
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records with the message merged but the traceback kept separate, so
+    the JSON file can store it in its own field
+    """
+
+    def prepare(self, record):
+        exc_text = record.exc_text
+        if record.exc_info:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+class TimedHandler(logging.Handler):
+    """
+    Hand records to the real handlers and record how long the logging call
+    blocked its caller as the log_emit_ms distribution
+    """
+
+    def __init__(self, *handlers):
+        super().__init__()
+        self.targets = handlers
+
+    def emit(self, record):
+        started = time.perf_counter()
+        for handler in self.targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        metrics.observe("log_emit_ms", round((time.perf_counter() - started) * 1000, 3))
+
+def setup_logging(name, level=logging.INFO, log_dir=LOG_DIR, sync=LOG_SYNC):
+    """
+    Configure process-wide logging for an entry point.
+
+    Records are stamped with the coin/stage context and put on a queue; a
+    listener thread formats them, writes JSON lines to <log_dir>/<name>.log
+    (rotated and gzipped) and human-readable lines to stderr. Calling it again
+    is a no-op. Returns the log file path.
+    """
+    global _listener
+    log_path = os.path.join(log_dir, f"{name}.log")
+    root = logging.getLogger()
+    if getattr(root, "_scraper_logging", False):
+        return log_path
+
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = CompressingRotatingFileHandler(log_path)
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    if sync:
+        entry_handler = TimedHandler(file_handler, console_handler)
+    else:
+        log_queue = queue.SimpleQueue()
+        entry_handler = TimedHandler(ContextQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                   respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    entry_handler.addFilter(ContextFilter())
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(entry_handler)
+    root.setLevel(level)
+    root._scraper_logging = True
+    return log_path
+
+def stop_logging():
+    """Flush everything still queued and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import time
+
+from atomic_write import write_json_atomic
+
+# Get the script's directory for relative file paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Path to the metrics snapshot file, rewritten as the run progresses
+METRICS_FILE = os.path.join(SCRIPT_DIR, "scraper_metrics.json")
+
+# How often the event loop lag monitor wakes up, and the lag counted as a stall
+LOOP_LAG_INTERVAL = 0.25
+LOOP_STALL_THRESHOLD_MS = 50
+
+# Process-wide metric values: gauges hold the latest value, counters accumulate,
+# distributions keep a running summary of every observed sample
+_gauges = {}
+_counters = {}
+_distributions = {}
+
+def set_gauge(name, value):
+    """Record the current value of a metric"""
+    _gauges[name] = value
+
+def incr(name, amount=1):
+    """Add to a counter metric"""
+    _counters[name] = _counters.get(name, 0) + amount
+
+def observe(name, value):
+    """Record one sample of a distribution metric (latency, memory, ...)"""
+    summary = _distributions.get(name)
+    if summary is None:
+        summary = _distributions[name] = {"count": 0, "sum": 0.0, "min": value, "max": value, "last": value}
+    summary["count"] += 1
+    summary["sum"] += value
+    summary["min"] = min(summary["min"], value)
+    summary["max"] = max(summary["max"], value)
+    summary["last"] = value
+
+async def monitor_loop_lag(interval=LOOP_LAG_INTERVAL):
+    """
+    Measure how late the event loop wakes a sleeping task, which is how long
+    something blocked the loop. Records event_loop_lag_ms and counts lags over
+    LOOP_STALL_THRESHOLD_MS as event_loop_stalls. Runs until cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, (loop.time() - expected) * 1000)
+        observe("event_loop_lag_ms", round(lag_ms, 2))
+        if lag_ms > LOOP_STALL_THRESHOLD_MS:
+            incr("event_loop_stalls")
+            incr("event_loop_stall_ms", round(lag_ms, 2))
+
+def snapshot():
+    """Return a copy of all metric values with a timestamp"""
+    return {
+        "timestamp": time.time(),
+        "gauges": dict(_gauges),
+        "counters": dict(_counters),
+        "distributions": {
+            name: {**summary, "mean": summary["sum"] / summary["count"]}
+            for name, summary in _distributions.items()
+        },
+    }
+
+def write_metrics(path=METRICS_FILE):
+    """Atomically write the current metrics snapshot so readers never see a partial file"""
+    write_json_atomic(snapshot(), path, indent=2)
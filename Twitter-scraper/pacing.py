@@ -0,0 +1,116 @@
+import asyncio
+import logging
+
+import metrics
+
+logger = logging.getLogger("pacing")
+
+class AIMDPacer:
+    """
+    Additive-increase / multiplicative-decrease pacing for Twitter searches.
+
+    Two knobs are controlled: the pause (delay) before the next search may
+    start, counted both from the start of the previous search and from the end
+    of the last one to finish, and how many searches may be in flight at once
+    (concurrency). Every healthy search shaves a fixed step off the delay and,
+    after a run of them, opens one more concurrent slot. A rate-limit or
+    login-wall signal halves concurrency and multiplies the delay; slow
+    responses and streaks of empty result pages back off more gently, since
+    either can also just mean a quiet coin.
+    """
+
+    def __init__(self, initial_delay=3.0, min_delay=0.5, max_delay=60.0,
+                 additive_step=0.25, backoff_factor=2.0, slow_backoff_factor=1.25,
+                 max_concurrency=3, increase_after=5, slow_latency=20.0, empty_streak_limit=3):
+        if not 0 < min_delay <= initial_delay <= max_delay:
+            raise ValueError("Delays must satisfy 0 < min_delay <= initial_delay <= max_delay")
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.additive_step = additive_step
+        self.backoff_factor = backoff_factor
+        self.slow_backoff_factor = slow_backoff_factor
+        self.max_concurrency = max_concurrency
+        self.increase_after = increase_after
+        self.slow_latency = slow_latency
+        self.empty_streak_limit = empty_streak_limit
+
+        self.concurrency = 1
+        self._active = 0
+        self._next_start = 0.0
+        self._healthy_streak = 0
+        self._empty_streak = 0
+        self._avg_latency = None
+        self._cond = asyncio.Condition()
+        self._publish()
+
+    @property
+    def rate(self):
+        """Estimated sustainable searches per minute at the current settings"""
+        spacing_limit = 1.0 / self.delay
+        if self._avg_latency:
+            spacing_limit = min(spacing_limit, self.concurrency / (self._avg_latency + self.delay))
+        return spacing_limit * 60
+
+    async def acquire(self):
+        """Wait for a free slot and for the current inter-request delay to pass"""
+        loop = asyncio.get_running_loop()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.concurrency)
+            self._active += 1
+            now = loop.time()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.delay
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def release(self, latency, result_count, throttled=None):
+        """
+        Free the slot taken by acquire and adapt to how the search went.
+        throttled is a short reason string when a rate-limit or login wall was seen.
+        """
+        async with self._cond:
+            self._active -= 1
+            self._observe(latency, result_count, throttled)
+            # Count the (possibly just backed-off) delay from the end of this search,
+            # so searches longer than the delay still leave a gap behind them
+            now = asyncio.get_running_loop().time()
+            self._next_start = max(self._next_start, now + self.delay)
+            self._cond.notify_all()
+
+    def _observe(self, latency, result_count, throttled):
+        if self._avg_latency is None:
+            self._avg_latency = latency
+        else:
+            self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+
+        self._empty_streak = self._empty_streak + 1 if result_count == 0 else 0
+
+        if throttled:
+            # Hard congestion signal: halve concurrency, back the delay right off
+            self.concurrency = max(1, self.concurrency // 2)
+            self.delay = min(self.max_delay, self.delay * self.backoff_factor)
+            self._healthy_streak = 0
+            metrics.incr("pacing_throttle_events")
+            logger.warning(f"Throttling detected ({throttled}), backing off to {self.delay:.2f}s delay, concurrency {self.concurrency}")
+        elif latency > self.slow_latency or self._empty_streak >= self.empty_streak_limit:
+            # Soft signal: slow pages or a run of empty results
+            self.delay = min(self.max_delay, self.delay * self.slow_backoff_factor)
+            self._healthy_streak = 0
+            self._empty_streak = 0
+            metrics.incr("pacing_soft_backoffs")
+            logger.info(f"Slow or empty searches, easing off to {self.delay:.2f}s delay")
+        else:
+            self.delay = max(self.min_delay, self.delay - self.additive_step)
+            self._healthy_streak += 1
+            if self._healthy_streak >= self.increase_after and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._healthy_streak = 0
+                logger.info(f"Searches healthy, raising concurrency to {self.concurrency}")
+
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("pacing_delay_seconds", round(self.delay, 3))
+        metrics.set_gauge("pacing_concurrency", self.concurrency)
+        metrics.set_gauge("pacing_rate_per_minute", round(self.rate, 2))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+import asyncio
+import contextlib
+import logging
+import sys
+import time
+from playwright.async_api import async_playwright
+
+from helix_scraper import scrape_helix_inj_pairs
+from twitter_scraper import (
+    BROWSER_LAUNCH_OPTIONS,
+    TWITTER_DATA_FILE,
+    coin_price_entry,
+    coin_symbol_from_pair,
+    create_twitter_context,
+    open_twitter_home,
+    peak_rss_mb,
+    process_coins,
+    require_gemini_api_keys,
+    save_coin_analysis,
+)
+from helix_price_stream import load_price_snapshot
+from leaderboard import LeaderboardPublisher
+from log_setup import log_context, setup_logging
+from tweet_records import ScrapeResults
+
+logger = logging.getLogger("pipeline")
+
+async def run_pipeline():
+    """
+    Run the Helix and Twitter scrapers in one process on a shared browser.
+
+    The Helix scrape runs in its own context and pushes each coin symbol onto a
+    queue as soon as its market shows up, while the Twitter context logs in and
+    starts searching as soon as the first symbol arrives. helix_data.json is
+    still written by the Helix side, so downstream consumers are unaffected.
+    """
+    start_time = time.time()
+    symbol_queue = asyncio.Queue()
+    queued_symbols = set()
+    # Prices for coins seen so far, so they can be ranked on the live leaderboard
+    # before the Helix scrape has finished
+    live_prices = load_price_snapshot()
+    prices = {}
+    leaderboard = LeaderboardPublisher()
+
+    def enqueue_pair(pair):
+        coin = coin_symbol_from_pair(pair['symbol'])
+        if coin and coin not in queued_symbols:
+            queued_symbols.add(coin)
+            prices[coin] = coin_price_entry(pair, live_prices)
+            symbol_queue.put_nowait(coin)
+            logger.info(f"Queued {coin} for Twitter search ({time.time() - start_time:.1f}s into run)")
+
+    async def coin_stream():
+        while True:
+            coin = await symbol_queue.get()
+            if coin is None:
+                return
+            yield coin
+
+    async with async_playwright() as p:
+        logger.info(f"Launching shared browser with options: {BROWSER_LAUNCH_OPTIONS}")
+        browser = await p.chromium.launch(**BROWSER_LAUNCH_OPTIONS)
+
+        async def helix_producer():
+            try:
+                with log_context(stage="helix"):
+                    return await scrape_helix_inj_pairs(browser=browser, on_pair=enqueue_pair)
+            finally:
+                # Always terminate the stream, even if Helix failed part way
+                symbol_queue.put_nowait(None)
+
+        helix_task = asyncio.create_task(helix_producer())
+        results = ScrapeResults(TWITTER_DATA_FILE)
+
+        twitter_failed = False
+        try:
+            try:
+                context = await create_twitter_context(browser)
+                if context is None:
+                    twitter_failed = True
+                else:
+                    page = await context.new_page()
+                    await open_twitter_home(page)
+                    processed = await process_coins(page, coin_stream(), results, leaderboard=leaderboard, prices=prices)
+            except Exception as e:
+                logger.error(f"Twitter scraper failed in pipeline: {e}", exc_info=True)
+                twitter_failed = True
+
+            # Let the Helix scrape finish even when Twitter failed, so helix_data.json
+            # is still refreshed as it was by the sequential flow
+            try:
+                helix_data = await helix_task
+            except Exception as e:
+                logger.error(f"Helix scraper failed in pipeline: {e}")
+                return 1
+            if twitter_failed:
+                return 1
+        finally:
+            # Only still running if we were interrupted
+            if not helix_task.done():
+                helix_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await helix_task
+            try:
+                await browser.close()
+                logger.info("Browser closed successfully")
+            except Exception as e:
+                logger.error(f"Error closing browser: {e}")
+            results.close()
+
+    logger.info(f"Scraped {processed} coins ({results.tweet_count} tweets) in {time.time() - start_time:.1f}s, peak RSS {peak_rss_mb():.1f} MB")
+
+    if results:
+        await save_coin_analysis(helix_data, results, len(queued_symbols), leaderboard=leaderboard)
+
+    return 0
+
+async def main():
+    """Main entry point"""
+    setup_logging("pipeline")
+    if not require_gemini_api_keys():
+        return 1
+
+    logger.info("Starting fused Helix -> Twitter pipeline")
+    try:
+        return await run_pipeline()
+    except Exception as e:
+        logger.error(f"Error in pipeline: {e}", exc_info=True)
+        return 1
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+from atomic_write import write_json_atomic
+from symbol_tagger import MENTION_KINDS, SymbolTagger
+from tweet_records import Tweet
+
+logger = logging.getLogger("query_planner")
+
+# Get the script's directory for relative file paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Per-coin tweet volume estimates carried between runs
+VOLUME_HISTORY_FILE = os.path.join(SCRIPT_DIR, "coin_volume_history.json")
+
+# Twitter rejects search queries much past 500 characters; stay well under
+MAX_QUERY_LENGTH = 450
+# Coins expected to return fewer tweets than this share a combined search
+LOW_VOLUME_THRESHOLD = 8
+# A search page yields a few dozen tweets after scrolling, so cap how much
+# expected volume one combined query has to carry and how many coins share it
+PACKED_VOLUME_BUDGET = 20
+MAX_COINS_PER_QUERY = 8
+# Weight of the latest run when updating the moving average of volumes
+VOLUME_HISTORY_ALPHA = 0.5
+
+class SearchQuery:
+    """A single Twitter search covering one coin, or several packed long-tail coins"""
+    __slots__ = ("coins", "query")
+
+    def __init__(self, coins, query):
+        self.coins = tuple(coins)
+        self.query = query
+
+    @property
+    def packed(self):
+        return len(self.coins) > 1
+
+    @property
+    def label(self):
+        return "+".join(self.coins)
+
+def coin_query(coin_symbol):
+    """Query used for a coin that gets its own search"""
+    return f"${coin_symbol} OR {coin_symbol} crypto"
+
+def packed_query(coin_symbols):
+    """Query combining several coins; cashtags only, so results can be demultiplexed"""
+    return " OR ".join(f"${coin}" for coin in coin_symbols)
+
+def load_volume_history(path=VOLUME_HISTORY_FILE):
+    """Load the per-coin tweet volume estimates, or an empty history"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Error loading volume history, starting fresh: {e}")
+        return {}
+
+def update_volume_history(history, coin_symbol, tweet_count):
+    """Fold the tweet count seen this run into the coin's moving average"""
+    previous = history.get(coin_symbol)
+    if previous is None:
+        history[coin_symbol] = float(tweet_count)
+    else:
+        history[coin_symbol] = VOLUME_HISTORY_ALPHA * tweet_count + (1 - VOLUME_HISTORY_ALPHA) * previous
+
+def save_volume_history(history, path=VOLUME_HISTORY_FILE):
+    write_json_atomic(history, path, indent=2, sort_keys=True)
+
+def is_low_volume(history, coin_symbol):
+    """Coins we have no history for get their own search until we know better"""
+    estimate = history.get(coin_symbol)
+    return estimate is not None and estimate < LOW_VOLUME_THRESHOLD
+
+async def plan_queries(coins, history):
+    """
+    Turn an async stream of coin symbols into a stream of SearchQuery objects.
+
+    High-volume and unknown coins are yielded straight away as their own
+    searches. Low-volume coins are held back and packed together until the
+    combined query would exceed the length limit, the expected volume budget
+    or the per-query coin cap; whatever is left is flushed when the stream ends.
+    """
+    pending = []
+    pending_volume = 0.0
+
+    async for coin in coins:
+        if not is_low_volume(history, coin):
+            yield SearchQuery([coin], coin_query(coin))
+            continue
+
+        estimate = history[coin]
+        candidate = pending + [coin]
+        if pending and (
+            len(packed_query(candidate)) > MAX_QUERY_LENGTH
+            or pending_volume + estimate > PACKED_VOLUME_BUDGET
+            or len(candidate) > MAX_COINS_PER_QUERY
+        ):
+            yield make_packed_query(pending)
+            pending, pending_volume = [], 0.0
+
+        pending.append(coin)
+        pending_volume += estimate
+
+    if pending:
+        yield make_packed_query(pending)
+
+def make_packed_query(coin_symbols):
+    if len(coin_symbols) == 1:
+        return SearchQuery(coin_symbols, coin_query(coin_symbols[0]))
+    return SearchQuery(coin_symbols, packed_query(coin_symbols))
+
+def demultiplex_tweets(raw_tweets, coin_symbols, discovery_time=None):
+    """
+    Assign tweets from a combined search back to the coins they mention.
+
+    Tweets are tagged with a SymbolTagger built from the packed coins, so only
+    cashtag and free-standing word mentions count; a tweet that mentions several
+    of the coins is recorded once for each. Returns the tweets per coin (every
+    coin present, possibly empty) and the number of tweets that matched none.
+    """
+    discovery_time = discovery_time or datetime.now().isoformat()
+    tagger = SymbolTagger(coin_symbols)
+    by_upper = {coin.upper(): coin for coin in coin_symbols}
+
+    assigned = {coin: [] for coin in coin_symbols}
+    unmatched = 0
+    for raw in raw_tweets:
+        mentions = tagger.tag_text(raw.get("text") or "")
+        matched = [by_upper[symbol] for symbol, kind in mentions.items() if kind in MENTION_KINDS]
+        if not matched:
+            unmatched += 1
+            continue
+        for coin in matched:
+            assigned[coin].append(Tweet.from_scraped(raw, coin, discovery_time))
+
+    return assigned, unmatched
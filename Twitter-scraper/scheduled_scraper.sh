@@ -34,13 +34,9 @@ run_helix_scraper() {
         echo "Xvfb started successfully with PID $XVFB_PID"
     fi
     
-    # Get current date-time for log file names
-    DATETIME=$(date +"%Y%m%d_%H%M%S")
-    HELIX_LOG_FILE="$LOG_DIR/helix_scraper_$DATETIME.log"
-    
-    # Run the Helix scraper
+    # Run the Helix scraper (it writes its own rotating log to logs/helix_scraper.log)
     cd "$SCRIPT_DIR"
-    python3 helix_scraper.py 2>&1 | tee -a "$HELIX_LOG_FILE"
+    python3 helix_scraper.py
     
     # Check if the scraper was successful
     if [ -f "$SCRIPT_DIR/helix_data.json" ]; then
@@ -76,13 +72,9 @@ run_twitter_scraper() {
         echo "Xvfb started successfully with PID $XVFB_PID"
     fi
     
-    # Get current date-time for log file names
-    DATETIME=$(date +"%Y%m%d_%H%M%S")
-    TWITTER_LOG_FILE="$LOG_DIR/twitter_scraper_$DATETIME.log"
-    
-    # Run the Twitter scraper
+    # Run the Twitter scraper (it writes its own rotating log to logs/twitter_scraper.log)
     cd "$SCRIPT_DIR"
-    python3 twitter_scraper.py 2>&1 | tee -a "$TWITTER_LOG_FILE"
+    python3 twitter_scraper.py
     
     # Check if the scraper was successful
     if [ -f "$SCRIPT_DIR/coin_investment_analysis.json" ]; then
@@ -94,10 +86,37 @@ run_twitter_scraper() {
     fi
 }
 
+# Function to run the fused Helix -> Twitter pipeline in a single process
+run_pipeline() {
+    echo "$(date): Starting fused Helix -> Twitter pipeline..."
+    
+    # Run the pipeline (it writes its own rotating log to logs/pipeline.log)
+    cd "$SCRIPT_DIR"
+    python3 pipeline.py
+    PIPELINE_RESULT=$?
+    
+    # Check if the pipeline was successful (a Twitter failure still refreshes the Helix data)
+    if [ $PIPELINE_RESULT -eq 0 ] && [ -f "$SCRIPT_DIR/coin_investment_analysis.json" ]; then
+        echo "$(date): Pipeline completed successfully"
+        return 0
+    else
+        echo "$(date): Pipeline failed - analysis file not found"
+        return 1
+    fi
+}
+
 # Main loop - run forever until interrupted
 run_scrapers() {
     echo "$(date): Starting scheduled scraper run..."
     
+    # By default Helix streams coins straight into the Twitter search in one
+    # process; set SCRAPER_MODE=sequential to run the two scrapers back to back
+    if [ "${SCRAPER_MODE:-fused}" == "fused" ]; then
+        run_pipeline
+        echo "$(date): Scheduled run finished, waiting for next interval"
+        return
+    fi
+    
     # First run the Helix scraper
     run_helix_scraper
     HELIX_RESULT=$?
@@ -128,8 +147,10 @@ if [ "$1" == "--setup-cron" ]; then
     # Remove any existing cron job
     (crontab -l 2>/dev/null | grep -v "scheduled_scraper.sh") | crontab -
     
-    # Add new cron job to run at the start of every hour
-    (crontab -l 2>/dev/null; echo "0 * * * * $SCRIPT_DIR/scheduled_scraper.sh --once >> $LOG_DIR/cron_$(date +\%Y\%m\%d).log 2>&1") | crontab -
+    # Add new cron job to run at the start of every hour. Each entry point writes
+    # its own rotating log under logs/, so the script's console output is dropped
+    # rather than collected in an ever-growing cron log
+    (crontab -l 2>/dev/null; echo "0 * * * * $SCRIPT_DIR/scheduled_scraper.sh --once > /dev/null 2>&1") | crontab -
     
     echo "Cron job set up to run scrapers at the start of every hour"
     exit 0
@@ -162,6 +183,19 @@ if [ "$1" == "--once" ]; then
     exit 0
 fi
 
+# Optionally keep a live Helix price stream running alongside the scrapers, so
+# scoring reads current prices from helix_prices.json instead of the hourly scrape.
+# Only the long-running schedule starts it: a --once (cron) run would kill the
+# stream on exit before it had written a useful snapshot, so cron runs keep
+# using the scraped prices unless a stream is run separately.
+if [ "${PRICE_STREAM:-0}" == "1" ]; then
+    echo "Starting Helix price stream"
+    # Its log goes to logs/helix_price_stream.log; console output only matters if it dies before logging starts
+    python3 "$SCRIPT_DIR/helix_price_stream.py" capture > "$LOG_DIR/helix_price_stream_stdout.log" 2>&1 &
+    PRICE_STREAM_PID=$!
+    trap "echo 'Cleaning up processes...'; kill $XVFB_PID $PRICE_STREAM_PID 2>/dev/null; echo 'Done.'" EXIT
+fi
+
 # Main scheduling loop
 echo "Starting hourly scraper schedule at $(date)"
 echo "The scrapers will run immediately and then at the start of every hour"
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import os
+import time
+import weakref
+
+import metrics
+
+logger = logging.getLogger("search_navigation")
+
+# "spa" switches searches inside the already loaded Twitter app; "reload" does a
+# full page load for every search, as the scraper used to (useful for comparison)
+SEARCH_NAVIGATION_MODE = os.getenv("SEARCH_NAVIGATION", "spa")
+# How long to wait for an in-app search to swap the results timeline before
+# trying the next method
+SWAP_TIMEOUT_MS = 15000
+# How long a full reload waits for the first tweet to render
+RELOAD_TWEET_TIMEOUT_MS = 20000
+# An in-app method that fails this many searches in a row is not tried again,
+# so a broken route doesn't add its timeouts to every later search
+MAX_METHOD_FAILURES = 3
+
+TWEET_SELECTOR = 'article[data-testid="tweet"]'
+SEARCH_BOX_SELECTOR = 'input[data-testid="SearchBox_Search_Input"]'
+
+# Mark everything currently rendered so the new timeline can be told apart from the old one
+MARK_STALE_JS = """
+() => {
+    document.querySelectorAll('article[data-testid="tweet"], [data-testid="emptyState"]')
+        .forEach(el => el.setAttribute('data-scraper-stale', '1'));
+    window.scrollTo(0, 0);
+}
+"""
+
+# Route the app to a new search without a page load, the way its own links do
+PUSH_SEARCH_JS = """
+(url) => {
+    const target = new URL(url);
+    history.pushState({}, '', target.pathname + target.search);
+    window.dispatchEvent(new PopStateEvent('popstate', { state: {} }));
+}
+"""
+
+# Truthy once the results timeline has been replaced: 'tweets' or 'empty'
+TIMELINE_SWAPPED_JS = """
+() => {
+    if (document.querySelector('article[data-testid="tweet"]:not([data-scraper-stale])')) return 'tweets';
+    if (document.querySelector('[data-testid="emptyState"]:not([data-scraper-stale])')) return 'empty';
+    return null;
+}
+"""
+
+class SearchNavigator:
+    """
+    Opens Twitter search results on a page, reusing the loaded app when possible.
+
+    Once a page has the Twitter app loaded, later searches change the route in
+    place (history.pushState plus a popstate event) and wait until the
+    timeline shows freshly rendered results, instead of reloading the whole
+    app bundle. If that doesn't swap the timeline, the query is typed into the
+    search box; if that fails too, the page is fully reloaded.
+
+    For every search the navigation time and the bytes the page downloaded
+    until the first results rendered (from CDP Network.loadingFinished) are
+    recorded per method as search_nav_<method>_seconds / _kb, so the in-app
+    paths can be compared against full reloads. An in-app method that fails
+    MAX_METHOD_FAILURES searches in a row is disabled for the rest of the run
+    (counted as search_nav_<method>_disabled).
+    """
+
+    def __init__(self, mode=SEARCH_NAVIGATION_MODE):
+        self.mode = mode
+        self._traffic = weakref.WeakKeyDictionary()
+        self._failures = {"spa": 0, "searchbox": 0}
+
+    def _record_failure(self, method):
+        self._failures[method] += 1
+        if self._failures[method] == MAX_METHOD_FAILURES:
+            logger.warning(f"In-app {method} navigation failed {MAX_METHOD_FAILURES} times in a row, no longer using it")
+            metrics.incr(f"search_nav_{method}_disabled")
+
+    async def _start_metering(self, page):
+        """Bytes counter for a page, attached on first use"""
+        counter = self._traffic.get(page)
+        if counter is None:
+            counter = [0]
+            try:
+                session = await page.context.new_cdp_session(page)
+                session.on("Network.loadingFinished",
+                           lambda params: counter.__setitem__(0, counter[0] + params.get("encodedDataLength", 0)))
+                await session.send("Network.enable")
+            except Exception as e:
+                logger.debug(f"Could not meter page traffic: {e}")
+            self._traffic[page] = counter
+        return counter
+
+    def _app_loaded(self, page):
+        url = page.url
+        return (url.startswith(("https://twitter.com/", "https://x.com/"))
+                and "/login" not in url and "/i/flow/" not in url)
+
+    async def open(self, page, url, label):
+        """
+        Show the search results for url on page. Returns True if tweets are
+        showing, False if the search has no results or they never rendered.
+        """
+        counter = await self._start_metering(page)
+        bytes_before = counter[0]
+        started = time.monotonic()
+
+        method = "reload"
+        found = None
+        if self.mode == "spa" and self._app_loaded(page):
+            for method, navigate in (("spa", self._push_search), ("searchbox", self._type_search)):
+                if self._failures[method] >= MAX_METHOD_FAILURES:
+                    continue
+                try:
+                    found = await navigate(page, url)
+                    self._failures[method] = 0
+                    break
+                except Exception as e:
+                    logger.warning(f"In-app {method} navigation failed for {label}, trying next method: {e}")
+                    metrics.incr("search_nav_fallbacks")
+                    self._record_failure(method)
+            else:
+                method = "reload"
+
+        if found is None:
+            found = await self._reload(page, url, label)
+
+        elapsed = time.monotonic() - started
+        metrics.incr(f"search_nav_{method}")
+        metrics.observe(f"search_nav_{method}_seconds", round(elapsed, 3))
+        metrics.observe(f"search_nav_{method}_kb", round((counter[0] - bytes_before) / 1024, 1))
+        logger.info(f"Opened search for {label} via {method} in {elapsed:.1f}s")
+        return found
+
+    async def _wait_for_swap(self, page):
+        handle = await page.wait_for_function(TIMELINE_SWAPPED_JS, timeout=SWAP_TIMEOUT_MS)
+        return await handle.json_value() == "tweets"
+
+    async def _push_search(self, page, url):
+        await page.evaluate(MARK_STALE_JS)
+        await page.evaluate(PUSH_SEARCH_JS, url)
+        return await self._wait_for_swap(page)
+
+    async def _type_search(self, page, url):
+        from urllib.parse import parse_qs, urlparse
+
+        query = parse_qs(urlparse(url).query)["q"][0]
+        await page.evaluate(MARK_STALE_JS)
+        search_box = await page.wait_for_selector(SEARCH_BOX_SELECTOR, timeout=5000)
+        await search_box.fill(query)
+        await search_box.press("Enter")
+        found = await self._wait_for_swap(page)
+
+        # The search box opens the Top tab; switch to Latest like the search URL does
+        latest_tab = await page.query_selector('a[href*="f=live"]')
+        if latest_tab is not None:
+            await page.evaluate(MARK_STALE_JS)
+            await latest_tab.click()
+            found = await self._wait_for_swap(page)
+        return found
+
+    async def _reload(self, page, url, label):
+        # Navigate to search URL with extended timeout
+        await page.goto(url, timeout=120000)  # Increase timeout to 2 minutes
+
+        # Wait for DOM content loaded instead of networkidle (less strict)
+        try:
+            await page.wait_for_load_state('domcontentloaded', timeout=30000)
+        except Exception as e:
+            logger.warning(f"Page load state timeout for {label}, continuing anyway: {e}")
+
+        # Sleep a moment to allow page to stabilize
+        await asyncio.sleep(3)
+
+        # Wait for tweets to load with more resilient approach
+        try:
+            # If initial check doesn't find tweets, wait for them to appear
+            if await page.query_selector(TWEET_SELECTOR) is None:
+                logger.info(f"Waiting for tweets to load for {label}...")
+                await page.wait_for_selector(TWEET_SELECTOR, timeout=RELOAD_TWEET_TIMEOUT_MS)
+        except Exception as e:
+            logger.warning(f"No tweets found for {label}: {e}")
+            return False
+        return True
@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import time
+
+from atomic_write import write_json_atomic
+
+logger = logging.getLogger("sentiment_state")
+
+# Get the script's directory for relative file paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Last Gemini result per coin, carried between runs for incremental analysis
+SENTIMENT_STATE_FILE = os.path.join(SCRIPT_DIR, "coin_sentiment_state.json")
+
+# Re-analyze from scratch after this many incremental updates, or once the last
+# full analysis is this old, so small errors in the running summary can't pile up
+FULL_REFRESH_EVERY = 6
+FULL_REFRESH_MAX_AGE = 24 * 60 * 60
+# If more than this share of a coin's tweets are new, the prior summary says
+# little about the conversation and a full analysis costs about the same
+FULL_REFRESH_NEW_FRACTION = 0.6
+# Tweet URLs remembered per coin to tell new tweets from ones already analyzed
+MAX_SEEN_URLS = 500
+
+# Modes returned by plan_analysis
+FULL = "full"
+INCREMENTAL = "incremental"
+SKIP = "skip"
+
+def load_sentiment_state(path=SENTIMENT_STATE_FILE):
+    """Load the per-coin analysis state, or an empty state"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Error loading sentiment state, starting fresh: {e}")
+        return {}
+
+def save_sentiment_state(state, path=SENTIMENT_STATE_FILE):
+    write_json_atomic(state, path, ensure_ascii=False, separators=(",", ":"))
+
+def plan_analysis(state, coin_symbol, tweets, now=None):
+    """
+    Decide how to analyze a coin's current tweets given its stored state.
+
+    Returns (mode, tweets_to_send): SKIP with no tweets when nothing is new,
+    INCREMENTAL with only the new tweets, or FULL with all of them when there
+    is no prior result or a refresh is due.
+    """
+    now = now or time.time()
+    entry = state.get(coin_symbol)
+    if not entry:
+        return FULL, tweets
+
+    seen = set(entry.get("seen_urls", []))
+    new_tweets = [tweet for tweet in tweets if not tweet.url or tweet.url not in seen]
+    if not new_tweets:
+        return SKIP, []
+
+    if (entry.get("incremental_updates", 0) >= FULL_REFRESH_EVERY
+            or now - entry.get("full_at", 0) > FULL_REFRESH_MAX_AGE
+            or len(new_tweets) > FULL_REFRESH_NEW_FRACTION * len(tweets)):
+        return FULL, tweets
+    return INCREMENTAL, new_tweets
+
+def prior_analysis(state, coin_symbol):
+    """The stored result in the shape Gemini returns it, for prompts and reuse"""
+    entry = state[coin_symbol]
+    return {
+        "sentiment_score": entry["sentiment_score"],
+        "investment_analysis": entry["investment_analysis"],
+        "key_factors": entry["key_factors"],
+    }
+
+def record_analysis(state, coin_symbol, analysis, tweets, mode, now=None):
+    """Store a fresh result and remember which tweets it covers"""
+    now = now or time.time()
+    entry = state.get(coin_symbol) or {}
+    seen = entry.get("seen_urls", []) if mode == INCREMENTAL else []
+    seen_set = set(seen)
+    seen = seen + [tweet.url for tweet in tweets if tweet.url and tweet.url not in seen_set]
+
+    state[coin_symbol] = {
+        "sentiment_score": analysis.get("sentiment_score"),
+        "investment_analysis": analysis.get("investment_analysis", analysis.get("analysis", "")),
+        "key_factors": analysis.get("key_factors", []),
+        "seen_urls": seen[-MAX_SEEN_URLS:],
+        "incremental_updates": entry.get("incremental_updates", 0) + 1 if mode == INCREMENTAL else 0,
+        "full_at": entry.get("full_at", now) if mode == INCREMENTAL else now,
+        "updated_at": now,
+    }
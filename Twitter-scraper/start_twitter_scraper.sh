@@ -27,13 +27,6 @@ fi
 
 echo "Xvfb started successfully with PID $XVFB_PID"
 
-# Create a log directory if it doesn't exist
-mkdir -p "$SCRIPT_DIR/logs"
-
-# Get current date-time for log file names
-DATETIME=$(date +"%Y%m%d_%H%M%S")
-LOG_FILE="$SCRIPT_DIR/logs/twitter_scraper_$DATETIME.log"
-
 # Display settings
 echo "Display settings:"
 echo "----------------"
@@ -56,10 +49,10 @@ fi
 # Run the Python script
 echo "Starting Twitter scraper..."
 cd "$SCRIPT_DIR"
-python3 twitter_scraper.py 2>&1 | tee -a "$LOG_FILE"
+python3 twitter_scraper.py
 
 # Print completion message
 echo "Twitter scraper completed"
-echo "Log saved to: $LOG_FILE"
+echo "Log saved to: $SCRIPT_DIR/logs/twitter_scraper.log"
 # Screenshots are now disabled to save storage space
 # echo "Screenshots saved to: $SCRIPT_DIR/screenshots" 
\ No newline at end of file
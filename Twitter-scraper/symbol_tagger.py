@@ -0,0 +1,187 @@
+import sys
+from bisect import bisect_right
+from collections import deque
+
+# Match kinds, strongest first. Cashtag and word matches are real mentions
+# (word matches only when written in uppercase, since symbols like APP, PAIN or
+# WHALE are also ordinary English words); handle/url matches (e.g. HINJ inside
+# @HINJ2010 or a twitter.com/HINJ2010 link) are kept for diagnostics but never
+# attribute a tweet to a coin.
+CASHTAG = "cashtag"
+WORD = "word"
+HANDLE_URL = "handle_url"
+MENTION_KINDS = (CASHTAG, WORD)
+_KIND_RANK = {CASHTAG: 0, WORD: 1, HANDLE_URL: 2}
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+def _fold(ch):
+    """Lowercase one character, leaving ones that lowercase to several (e.g. "İ") alone"""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+class SymbolTagger:
+    """
+    Aho-Corasick matcher over the full list of coin symbols.
+
+    The automaton is built once from the symbols and then scans each text in a
+    single pass, case-insensitively, regardless of how many symbols there are.
+    Every hit is classified by its surroundings: a "$" prefix makes it a
+    cashtag, an "@" prefix or a URL token makes it a handle/url match, and an
+    otherwise free-standing word written in uppercase is a word match. Hits
+    embedded inside longer words (HINJ in HINJ2010) and free-standing words in
+    lower or mixed case ("a pain to test") are dropped.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = sorted({sys.intern(symbol.upper()) for symbol in symbols if symbol})
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for symbol in self.symbols:
+            self._add(symbol)
+        self._build_failure_links()
+
+    def _add(self, symbol):
+        state = 0
+        for ch in map(_fold, symbol):
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (symbol,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """Yield (start, end, symbol) for every occurrence of a symbol in text"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        # Fold per character so match offsets stay aligned with the original text
+        for index, ch in enumerate(map(_fold, text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for symbol in output[state]:
+                yield index + 1 - len(symbol), index + 1, symbol
+
+    def tag_text(self, text, mentions=None):
+        """Classify every symbol occurrence in text, keeping the strongest kind per symbol"""
+        mentions = {} if mentions is None else mentions
+        if not text:
+            return mentions
+
+        url_spans = _url_spans(text)
+        for start, end, symbol in self.find(text):
+            # Ignore hits embedded in a longer word
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            prefix = text[start - 1] if start > 0 else ""
+            if prefix == "$":
+                kind = CASHTAG
+            elif prefix == "@" or _inside(url_spans, start):
+                kind = HANDLE_URL
+            elif prefix and _is_word_char(prefix):
+                continue
+            elif text[start:end] == symbol:
+                kind = WORD
+            else:
+                # Lowercase or capitalized, e.g. "app" or "Whale": an ordinary word
+                continue
+            _keep_strongest(mentions, symbol, kind)
+        return mentions
+
+    def tag_tweet(self, tweet):
+        """Set tweet.mentions from its text, handle and URL and return it"""
+        mentions = self.tag_text(tweet.text)
+        # Any hit in the author's handle is a handle match, even inside a longer name
+        for field in (tweet.handle, _author_from_url(tweet.url)):
+            for _, _, symbol in self.find(field):
+                _keep_strongest(mentions, symbol, HANDLE_URL)
+        tweet.mentions = mentions
+        return mentions
+
+def _keep_strongest(mentions, symbol, kind):
+    current = mentions.get(symbol)
+    if current is None or _KIND_RANK[kind] < _KIND_RANK[current]:
+        mentions[symbol] = kind
+
+def _author_from_url(url):
+    """Author handle from a twitter.com/<handle>/status/<id> URL"""
+    parts = url.split("/") if url else []
+    return parts[3] if len(parts) > 4 and parts[4] == "status" else ""
+
+def _url_spans(text):
+    """(start, end) of every whitespace-delimited token that looks like a URL"""
+    spans = []
+    start = None
+    for index, ch in enumerate(text + " "):
+        if ch.isspace():
+            if start is not None:
+                token = text[start:index]
+                if "://" in token or token.startswith("www.") or ".com/" in token:
+                    spans.append((start, index))
+                start = None
+        elif start is None:
+            start = index
+    return spans
+
+def _inside(spans, position):
+    index = bisect_right(spans, (position, float("inf"))) - 1
+    return index >= 0 and spans[index][0] <= position < spans[index][1]
+
+def real_mentions(tweet):
+    """Symbols a tagged tweet actually talks about (cashtag or word matches)"""
+    return [symbol for symbol, kind in tweet.mentions.items() if kind in MENTION_KINDS]
+
+def build_mention_index(tweets_by_coin, tagger):
+    """
+    Tag every collected tweet and build the cross-mention index.
+
+    Tweets are deduplicated by URL across searches, so a tweet found by two
+    coins' searches counts once. Returns {symbol: {"tweets": [...], "kinds":
+    {kind: count}, "co_mentions": {other_symbol: count}}}, where "tweets" holds
+    each tweet that really mentions the symbol, whichever search found it.
+    """
+    index = {}
+    seen = set()
+    for tweets in tweets_by_coin.values():
+        for tweet in tweets:
+            key = tweet.url or id(tweet)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            tagger.tag_tweet(tweet)
+            mentioned = real_mentions(tweet)
+            for symbol in mentioned:
+                entry = index.setdefault(symbol, {"tweets": [], "kinds": {}, "co_mentions": {}})
+                entry["tweets"].append(tweet)
+                kind = tweet.mentions[symbol]
+                entry["kinds"][kind] = entry["kinds"].get(kind, 0) + 1
+                for other in mentioned:
+                    if other != symbol:
+                        entry["co_mentions"][other] = entry["co_mentions"].get(other, 0) + 1
+            for symbol, kind in tweet.mentions.items():
+                if kind == HANDLE_URL:
+                    entry = index.setdefault(symbol, {"tweets": [], "kinds": {}, "co_mentions": {}})
+                    entry["kinds"][kind] = entry["kinds"].get(kind, 0) + 1
+    return index
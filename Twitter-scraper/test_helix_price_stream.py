@@ -0,0 +1,36 @@
+import os
+
+from helix_price_stream import PriceTable, load_price_snapshot, replay_frames_into
+
+FRAMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "helix_frames.ndjson")
+
+def test_replay_applies_ticker_market_id_and_binary_frames():
+    table = PriceTable(market_ids={"0xdef": "HINJ/INJ"})
+    assert replay_frames_into(table, FRAMES) == 4
+
+    price, change, volume, _ = table.prices["NEPT/INJ"]
+    # The later market-ID-only frame updates the price and keeps change/volume
+    assert (price, change, volume) == (0.04, 6.18, 12345.0)
+    assert table.market_ids["0xabc"] == "NEPT/INJ"
+    assert table.prices["HINJ/INJ"][0] == 1.5
+    assert table.prices["ZIG/INJ"][:3] == [0.01, None, 900.0]
+
+def test_unparseable_frames_are_ignored():
+    table = PriceTable()
+    assert table.handle_frame("ping") == 0
+    assert table.handle_frame(b"\xff\xfe") == 0
+    assert table.prices == {}
+
+def test_snapshot_round_trip(tmp_path):
+    table = PriceTable(market_ids={"0xdef": "HINJ/INJ"})
+    replay_frames_into(table, FRAMES)
+    path = tmp_path / "helix_prices.json"
+    table.write_snapshot(str(path))
+
+    prices = load_price_snapshot(str(path))
+    assert set(prices) == {"NEPT/INJ", "HINJ/INJ", "ZIG/INJ"}
+    assert prices["NEPT/INJ"]["price"] == 0.04
+    assert prices["NEPT/INJ"]["change_24h"] == 6.18
+    assert prices["ZIG/INJ"]["volume"] == 900.0
+    # Snapshots older than max_age are ignored
+    assert load_price_snapshot(str(path), max_age=-1) == {}
@@ -0,0 +1,21 @@
+from symbol_tagger import CASHTAG, HANDLE_URL, WORD, SymbolTagger
+
+SYMBOLS = ["APP", "PAIN", "TEST", "WHALE", "HINJ", "INJ"]
+
+def test_lowercase_words_are_not_mentions():
+    tagger = SymbolTagger(SYMBOLS)
+    assert tagger.tag_text("This app is a pain to test, whale alert!") == {}
+    assert tagger.tag_text("Whale Alert: Test your App") == {}
+
+def test_uppercase_words_and_cashtags_are_mentions():
+    tagger = SymbolTagger(SYMBOLS)
+    assert tagger.tag_text("WHALE just bought more INJ") == {"WHALE": WORD, "INJ": WORD}
+    assert tagger.tag_text("$app and $Pain are pumping") == {"APP": CASHTAG, "PAIN": CASHTAG}
+
+def test_handles_and_embedded_hits_are_not_word_mentions():
+    tagger = SymbolTagger(SYMBOLS)
+    assert tagger.tag_text("thanks @HINJ for HINJ2010") == {"HINJ": HANDLE_URL}
+
+def test_offsets_survive_characters_that_lengthen_when_lowercased():
+    tagger = SymbolTagger(["NEPT", "ZIG"])
+    assert tagger.tag_text("İstanbul loves $NEPT and ZIG") == {"NEPT": CASHTAG, "ZIG": WORD}
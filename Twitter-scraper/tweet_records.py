@@ -0,0 +1,146 @@
+import json
+import os
+import sys
+
+# Keys shared by every tweet record, in output order
+TWEET_FIELDS = (
+    "username",
+    "handle",
+    "text",
+    "timestamp",
+    "reply_count",
+    "retweet_count",
+    "like_count",
+    "url",
+    "coin_symbol",
+    "discovery_time",
+    "analyzed",
+    "mentions",
+)
+
+class Tweet:
+    """
+    Compact record for a single scraped tweet.
+
+    Slotted so large runs don't carry a per-tweet dict, with the heavily repeated
+    strings (usernames, handles, coin symbols, discovery times) interned so every
+    tweet from the same author or batch shares one string object.
+    """
+    __slots__ = TWEET_FIELDS
+
+    def __init__(self, username, handle, text, timestamp, reply_count, retweet_count,
+                 like_count, url, coin_symbol, discovery_time, analyzed=False, mentions=None):
+        self.username = sys.intern(username)
+        self.handle = sys.intern(handle)
+        self.text = text
+        self.timestamp = timestamp
+        self.reply_count = reply_count
+        self.retweet_count = retweet_count
+        self.like_count = like_count
+        self.url = url
+        self.coin_symbol = sys.intern(coin_symbol)
+        self.discovery_time = sys.intern(discovery_time)
+        self.analyzed = analyzed
+        # symbol -> match kind, filled in by SymbolTagger
+        self.mentions = mentions or {}
+
+    @classmethod
+    def from_scraped(cls, raw, coin_symbol, discovery_time):
+        """Build a record from the dict returned by the in-page extraction script"""
+        return cls(
+            raw.get("username") or "Unknown",
+            raw.get("handle") or "",
+            raw.get("text") or "(No text)",
+            raw.get("timestamp") or "",
+            raw.get("reply_count") or 0,
+            raw.get("retweet_count") or 0,
+            raw.get("like_count") or 0,
+            raw.get("url") or "",
+            coin_symbol,
+            discovery_time,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a stored NDJSON line"""
+        return cls(*(data.get(field) for field in TWEET_FIELDS[:-2]),
+                   analyzed=data.get("analyzed", False), mentions=data.get("mentions"))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in TWEET_FIELDS}
+
+class ScrapeResults:
+    """
+    Tweets and sentiment analyses collected during a run.
+
+    Each coin's tweets and analysis are appended to a line-delimited JSON file as
+    soon as they are added, so consumers can read results incrementally and the
+    scraper never has to rewrite everything collected so far. While the run is in
+    progress the file is <output_path>.tmp; close() moves it over output_path,
+    so a run that collects nothing never replaces the last good store.
+    """
+
+    def __init__(self, output_path=None):
+        self.tweets = {}
+        self.analyses = {}
+        self.output_path = output_path
+        self.partial_path = f"{output_path}.tmp" if output_path else None
+        self._output = open(self.partial_path, "w", encoding="utf-8") if output_path else None
+
+    def add_coin(self, coin_symbol, tweets, analysis=None):
+        """Record a coin's tweets (and optional analysis) and stream them to the output file"""
+        self.tweets[coin_symbol] = tweets
+        if analysis is not None:
+            self.analyses[coin_symbol] = analysis
+
+        if self._output:
+            lines = [json.dumps({"type": "tweet", **tweet.to_dict()}, ensure_ascii=False) for tweet in tweets]
+            if analysis is not None:
+                lines.append(json.dumps({"type": "analysis", "coin_symbol": coin_symbol, **analysis}, ensure_ascii=False))
+            if lines:
+                self._output.write("\n".join(lines) + "\n")
+                self._output.flush()
+
+    @property
+    def tweet_count(self):
+        return sum(len(tweets) for tweets in self.tweets.values())
+
+    def __bool__(self):
+        return bool(self.tweets)
+
+    def close(self):
+        if self._output:
+            self._output.close()
+            self._output = None
+            if self:
+                os.replace(self.partial_path, self.output_path)
+            else:
+                os.remove(self.partial_path)
+
+def iter_records(path):
+    """Yield each record from an NDJSON results file, tolerating a partially written last line"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # The writer may still be mid-line
+                break
+
+def load_results(path):
+    """Load a stored NDJSON results file back into a ScrapeResults without reopening it for writing"""
+    results = ScrapeResults()
+    if not os.path.exists(path):
+        return results
+
+    for record in iter_records(path):
+        record_type = record.pop("type", "tweet")
+        if record_type == "analysis":
+            results.analyses[record.pop("coin_symbol")] = record
+        else:
+            tweet = Tweet.from_dict(record)
+            results.tweets.setdefault(tweet.coin_symbol, []).append(tweet)
+    return results
@@ -4,78 +4,133 @@ import json
 import logging
 import os
 import sys
+import argparse
 from datetime import datetime, timedelta
-from playwright.async_api import async_playwright, TimeoutError
+from functools import lru_cache
 import re
-import numpy as np
-from collections import defaultdict
 import time
-import google.generativeai as genai
-from dotenv import load_dotenv
-import random
+import resource
+from urllib.parse import quote
 
-# Load environment variables from .env file
-load_dotenv()
+import metrics
+from browser_watchdog import BrowserWatchdog
+from gemini_client import HedgedGeminiClient
+from pacing import AIMDPacer
+from helix_price_stream import load_price_snapshot
+from leaderboard import Leaderboard, LeaderboardPublisher
+from log_setup import log_context, setup_logging
+from sentiment_state import (
+    INCREMENTAL,
+    SKIP,
+    load_sentiment_state,
+    plan_analysis,
+    prior_analysis,
+    record_analysis,
+    save_sentiment_state,
+)
+from symbol_tagger import SymbolTagger, build_mention_index
+from search_navigation import SearchNavigator
+from query_planner import (
+    coin_query,
+    demultiplex_tweets,
+    load_volume_history,
+    plan_queries,
+    save_volume_history,
+    update_volume_history,
+)
+from tweet_records import ScrapeResults, Tweet, load_results
+
+# playwright, the Gemini client and dotenv are imported inside the functions
+# that need them, so offline re-analysis and export start without the
+# browser/AI stack and never touch the network
 
 # Get the script's directory for relative file paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(SCRIPT_DIR, "twitter_scraper.log")),
-        logging.StreamHandler()
-    ]
-)
+# Logging is configured by the entry point (see log_setup.setup_logging)
 logger = logging.getLogger("twitter_scraper")
 
 # Path to Twitter cookies file
 COOKIES_FILE = os.path.join(SCRIPT_DIR, "twitter_cookies.json")
 # Path to helix data file
 HELIX_DATA_FILE = os.path.join(SCRIPT_DIR, "helix_data.json")
-# Path to output Twitter data file
-TWITTER_DATA_FILE = os.path.join(SCRIPT_DIR, "twitter_coin_data.json")
+# Path to output Twitter data file (one JSON record per line, written as coins complete)
+TWITTER_DATA_FILE = os.path.join(SCRIPT_DIR, "twitter_coin_data.ndjson")
 # Path to analysis output file
 ANALYSIS_OUTPUT_FILE = os.path.join(SCRIPT_DIR, "coin_investment_analysis.json")
+# Path to the cross-mention index written alongside the analysis
+MENTION_INDEX_FILE = os.path.join(SCRIPT_DIR, "coin_mention_index.json")
 
-# Get Gemini API keys from environment variables
-GEMINI_API_KEYS = [
-    os.getenv("GEMINI_API_KEY"),
-    os.getenv("GEMINI_API_KEY_2"),
-    os.getenv("GEMINI_API_KEY_3")
-]
+# Upper bound on concurrent Twitter search pages the pacer may ramp up to
+MAX_SEARCH_CONCURRENCY = 3
 
-# Filter out None or empty API keys
-GEMINI_API_KEYS = [key for key in GEMINI_API_KEYS if key]
+# Combined searches re-checked against individual searches each run to measure recall
+RECALL_AUDIT_QUERIES = 1
 
-if not GEMINI_API_KEYS:
-    logger.error("No valid Gemini API keys found in environment variables")
-    sys.exit(1)
+# Default weights for the investment score
+SCORE_WEIGHTS = {
+    "engagement": 0.3,
+    "sentiment": 40,
+    "price_change": 0.5,
+}
 
-logger.info(f"Found {len(GEMINI_API_KEYS)} Gemini API keys")
+@lru_cache(maxsize=None)
+def get_gemini_api_keys():
+    """Load Gemini API keys from the environment (and .env file), skipping empty ones"""
+    from dotenv import load_dotenv
+    
+    # Load environment variables from .env file
+    load_dotenv()
+    
+    keys = [
+        os.getenv("GEMINI_API_KEY"),
+        os.getenv("GEMINI_API_KEY_2"),
+        os.getenv("GEMINI_API_KEY_3")
+    ]
+    
+    # Filter out None or empty API keys
+    keys = tuple(key for key in keys if key)
+    if keys:
+        logger.info(f"Found {len(keys)} Gemini API keys")
+    return keys
 
-def load_helix_data():
+def require_gemini_api_keys():
+    """Check that Gemini keys are configured before starting a run that needs them"""
+    if not get_gemini_api_keys():
+        logger.error("No valid Gemini API keys found in environment variables")
+        return False
+    return True
+
+def load_helix_data(path=HELIX_DATA_FILE):
     """Load coin data from helix_data.json"""
     try:
-        with open(HELIX_DATA_FILE, 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except Exception as e:
         logger.error(f"Error loading helix data: {e}")
         return None
 
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in megabytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux but bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def coin_symbol_from_pair(pair_symbol):
+    """Extract the coin part before /INJ from a Helix trading pair symbol"""
+    return pair_symbol.split('/')[0]
+
 def extract_coin_symbols(helix_data):
     """Extract coin symbols from helix data"""
     coins = []
     if not helix_data or 'data' not in helix_data:
         return coins
     
+    # Several markets can share a base asset (e.g. NEPT/INJ and NEPT/USDT); search each coin once
     for item in helix_data['data']:
         if 'symbol' in item:
-            # Extract the coin part before /INJ
-            symbol = item['symbol'].split('/')[0]
-            coins.append(symbol)
+            coins.append(coin_symbol_from_pair(item['symbol']))
+    coins = list(dict.fromkeys(coins))
     
     logger.info(f"Extracted {len(coins)} coin symbols from helix data")
     return coins
@@ -140,37 +195,143 @@ async def load_cookies(context):
         logger.error("You may need to refresh your Twitter cookies or provide them in the correct format")
         return False
 
-async def search_twitter_for_coin(page, coin_symbol):
-    """Search Twitter for a specific coin symbol"""
-    search_url = f"https://twitter.com/search?q=%24{coin_symbol}%20OR%20{coin_symbol}%20crypto&src=typed_query&f=live"
+# Runs in the page and returns every tweet currently in the search timeline.
+# Articles SearchNavigator marked stale belong to the previous search and are skipped.
+EXTRACT_TWEETS_JS = """
+() => {
+    const tweets = [];
+    const tweetElements = document.querySelectorAll('article[data-testid="tweet"]:not([data-scraper-stale])');
+    
+    if (!tweetElements || tweetElements.length === 0) {
+        return tweets; // Return empty array if no tweets
+    }
+    
+    tweetElements.forEach(tweet => {
+        try {
+            // Username and handle
+            const userElement = tweet.querySelector('div[data-testid="User-Name"]');
+            const username = userElement ? userElement.querySelector('span:first-child')?.textContent : null;
+            const handleElement = userElement ? userElement.querySelector('span:nth-child(2)')?.textContent : null;
+            
+            // Tweet text
+            const textElement = tweet.querySelector('div[data-testid="tweetText"]');
+            const text = textElement ? textElement.textContent : null;
+            
+            // Time
+            const timeElement = tweet.querySelector('time');
+            const timestamp = timeElement ? timeElement.getAttribute('datetime') : null;
+            
+            // Engagement metrics
+            const replyElement = tweet.querySelector('div[data-testid="reply"]');
+            const replyCount = replyElement ? replyElement.textContent : '0';
+            
+            const retweetElement = tweet.querySelector('div[data-testid="retweet"]');
+            const retweetCount = retweetElement ? retweetElement.textContent : '0';
+            
+            const likeElement = tweet.querySelector('div[data-testid="like"]');
+            const likeCount = likeElement ? likeElement.textContent : '0';
+            
+            // URL
+            const linkElement = tweet.querySelector('a[href*="/status/"]');
+            const url = linkElement ? 'https://twitter.com' + linkElement.getAttribute('href') : null;
+            
+            // Only add tweet if we have at least text or username
+            if (text || username) {
+                tweets.push({
+                    username: username || "Unknown",
+                    handle: handleElement || "",
+                    text: text || "(No text)",
+                    timestamp: timestamp || "",
+                    reply_count: parseEngagementCount(replyCount),
+                    retweet_count: parseEngagementCount(retweetCount),
+                    like_count: parseEngagementCount(likeCount),
+                    url: url || ""
+                });
+            }
+        } catch (error) {
+            console.error('Error parsing tweet:', error);
+        }
+    });
+    
+    function parseEngagementCount(countText) {
+        if (!countText) return 0;
+        countText = countText.trim();
+        if (countText === '') return 0;
+        
+        try {
+            if (countText.includes('K')) {
+                return parseInt(parseFloat(countText.replace('K', '')) * 1000);
+            } else if (countText.includes('M')) {
+                return parseInt(parseFloat(countText.replace('M', '')) * 1000000);
+            } else {
+                return parseInt(countText);
+            }
+        } catch (e) {
+            return 0;
+        }
+    }
+    
+    return tweets;
+}
+"""
+
+# Strips images and video from tweets more than two screens above the viewport.
+# They have already been collected, and their decoded media is what keeps a
+# long-lived, repeatedly scrolled search page growing.
+TRIM_OFFSCREEN_TWEETS_JS = """
+() => {
+    const limit = -2 * window.innerHeight;
+    let trimmed = 0;
+    document.querySelectorAll('article[data-testid="tweet"]').forEach(tweet => {
+        if (tweet.dataset.trimmed || tweet.getBoundingClientRect().bottom > limit) return;
+        tweet.querySelectorAll('video').forEach(video => {
+            video.pause();
+            video.removeAttribute('src');
+            video.querySelectorAll('source').forEach(source => source.remove());
+            video.load();
+        });
+        tweet.querySelectorAll('img').forEach(img => img.removeAttribute('src'));
+        tweet.dataset.trimmed = '1';
+        trimmed++;
+    });
+    return trimmed;
+}
+"""
+
+def build_search_url(query):
+    """Build the Latest-tab search URL for a Twitter query"""
+    return f"https://twitter.com/search?q={quote(query)}&src=typed_query&f=live"
+
+async def search_twitter(page, query, label):
+    """
+    Run a Twitter search and return the raw tweet dicts extracted from the page.
+    label names the coin (or group of coins) the query is for in log messages.
+    """
+    search_url = build_search_url(query)
     
     try:
-        logger.info(f"Searching Twitter for {coin_symbol}")
+        logger.info(f"Searching Twitter for {label}")
         
-        # Navigate to search URL with extended timeout
-        await page.goto(search_url, timeout=120000)  # Increase timeout to 2 minutes
+        # Switch the already loaded app to the new search where possible,
+        # falling back to a full page load
+        if not await get_search_navigator().open(page, search_url, label):
+            logger.warning(f"No tweets found for {label}")
+            return []
         
-        # Wait for DOM content loaded instead of networkidle (less strict)
-        try:
-            await page.wait_for_load_state('domcontentloaded', timeout=30000)
-        except Exception as e:
-            logger.warning(f"Page load state timeout for {coin_symbol}, continuing anyway: {e}")
+        # Collect tweets as we scroll: the timeline is virtualized, so tweets that
+        # scroll far enough away are no longer in the DOM by the end
+        collected = {}
         
-        # Sleep a moment to allow page to stabilize
-        await asyncio.sleep(3)
+        async def collect_visible_tweets():
+            for tweet in await page.evaluate(EXTRACT_TWEETS_JS):
+                key = tweet.get("url") or (tweet.get("username"), tweet.get("text"))
+                collected.setdefault(key, tweet)
         
-        # Wait for tweets to load with more resilient approach
+        # Extract tweets with improved error handling
         try:
-            # Try to find any tweet elements
-            tweet_selector = 'article[data-testid="tweet"]'
-            has_tweets = await page.query_selector(tweet_selector) is not None
-            
-            # If initial check doesn't find tweets, wait for them to appear
-            if not has_tweets:
-                logger.info(f"Waiting for tweets to load for {coin_symbol}...")
-                await page.wait_for_selector(tweet_selector, timeout=20000)
+            await collect_visible_tweets()
         except Exception as e:
-            logger.warning(f"No tweets found for {coin_symbol}: {e}")
+            logger.error(f"Error extracting tweets for {label}: {e}")
             return []
         
         # Scroll to load more tweets with error handling
@@ -178,124 +339,42 @@ async def search_twitter_for_coin(page, coin_symbol):
             try:
                 await page.evaluate('window.scrollBy(0, 1000)')
                 await asyncio.sleep(2)  # Give more time for content to load
+                await collect_visible_tweets()
+                # Drop media from tweets already collected and scrolled out of view
+                await page.evaluate(TRIM_OFFSCREEN_TWEETS_JS)
             except Exception as e:
-                logger.warning(f"Error scrolling for {coin_symbol} (scroll #{i+1}): {e}")
+                logger.warning(f"Error scrolling for {label} (scroll #{i+1}): {e}")
                 # Continue despite scroll errors
         
-        # Extract tweets with improved error handling
-        try:
-            tweets = await page.evaluate("""
-            () => {
-                const tweets = [];
-                const tweetElements = document.querySelectorAll('article[data-testid="tweet"]');
-                
-                if (!tweetElements || tweetElements.length === 0) {
-                    return tweets; // Return empty array if no tweets
-                }
-                
-                tweetElements.forEach(tweet => {
-                    try {
-                        // Username and handle
-                        const userElement = tweet.querySelector('div[data-testid="User-Name"]');
-                        const username = userElement ? userElement.querySelector('span:first-child')?.textContent : null;
-                        const handleElement = userElement ? userElement.querySelector('span:nth-child(2)')?.textContent : null;
-                        
-                        // Tweet text
-                        const textElement = tweet.querySelector('div[data-testid="tweetText"]');
-                        const text = textElement ? textElement.textContent : null;
-                        
-                        // Time
-                        const timeElement = tweet.querySelector('time');
-                        const timestamp = timeElement ? timeElement.getAttribute('datetime') : null;
-                        
-                        // Engagement metrics
-                        const replyElement = tweet.querySelector('div[data-testid="reply"]');
-                        const replyCount = replyElement ? replyElement.textContent : '0';
-                        
-                        const retweetElement = tweet.querySelector('div[data-testid="retweet"]');
-                        const retweetCount = retweetElement ? retweetElement.textContent : '0';
-                        
-                        const likeElement = tweet.querySelector('div[data-testid="like"]');
-                        const likeCount = likeElement ? likeElement.textContent : '0';
-                        
-                        // URL
-                        const linkElement = tweet.querySelector('a[href*="/status/"]');
-                        const url = linkElement ? 'https://twitter.com' + linkElement.getAttribute('href') : null;
-                        
-                        // Only add tweet if we have at least text or username
-                        if (text || username) {
-                            tweets.push({
-                                username: username || "Unknown",
-                                handle: handleElement || "",
-                                text: text || "(No text)",
-                                timestamp: timestamp || "",
-                                reply_count: parseEngagementCount(replyCount),
-                                retweet_count: parseEngagementCount(retweetCount),
-                                like_count: parseEngagementCount(likeCount),
-                                url: url || ""
-                            });
-                        }
-                    } catch (error) {
-                        console.error('Error parsing tweet:', error);
-                    }
-                });
-                
-                function parseEngagementCount(countText) {
-                    if (!countText) return 0;
-                    countText = countText.trim();
-                    if (countText === '') return 0;
-                    
-                    try {
-                        if (countText.includes('K')) {
-                            return parseInt(parseFloat(countText.replace('K', '')) * 1000);
-                        } else if (countText.includes('M')) {
-                            return parseInt(parseFloat(countText.replace('M', '')) * 1000000);
-                        } else {
-                            return parseInt(countText);
-                        }
-                    } catch (e) {
-                        return 0;
-                    }
-                }
-                
-                return tweets;
-            }
-            """)
-        except Exception as e:
-            logger.error(f"Error extracting tweets for {coin_symbol}: {e}")
-            return []
-        
-        # Add metadata to tweets
-        for tweet in tweets:
-            tweet['coin_symbol'] = coin_symbol
-            tweet['discovery_time'] = datetime.now().isoformat()
+        tweets = list(collected.values())
         
-        logger.info(f"Found {len(tweets)} tweets for {coin_symbol}")
+        logger.info(f"Found {len(tweets)} tweets for {label}")
         return tweets
     
     except Exception as e:
-        logger.error(f"Error searching Twitter for {coin_symbol}: {e}")
+        logger.error(f"Error searching Twitter for {label}: {e}")
         return []
 
-def analyze_sentiment_with_gemini(tweets_text, coin_symbol):
-    """
-    Analyze tweet sentiment using Google's Gemini API
-    Returns a dict with sentiment score and investment analysis
-    """
-    if not tweets_text:
-        logger.warning(f"No tweets to analyze for {coin_symbol}")
-        return {"sentiment_score": 0, "analysis": "No data available"}
-    
-    # Rotate through available API keys to avoid rate limits
-    api_key = random.choice(GEMINI_API_KEYS)
-    genai.configure(api_key=api_key)
+async def search_twitter_for_coin(page, coin_symbol):
+    """Search Twitter for a specific coin symbol"""
+    tweets = await search_twitter(page, coin_query(coin_symbol), coin_symbol)
     
-    try:
-        # Configure the model
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Create the prompt for Gemini
-        prompt = f"""
+    # Convert to compact records; the whole batch shares one discovery time
+    discovery_time = datetime.now().isoformat()
+    return [Tweet.from_scraped(tweet, coin_symbol, discovery_time) for tweet in tweets]
+
+@lru_cache(maxsize=None)
+def get_search_navigator():
+    """Shared navigator, so per-page traffic meters survive across searches"""
+    return SearchNavigator()
+
+@lru_cache(maxsize=None)
+def get_gemini_client():
+    """Shared hedged Gemini client over every configured API key"""
+    return HedgedGeminiClient(get_gemini_api_keys())
+
+def build_sentiment_prompt(tweets_text, coin_symbol):
+    return f"""
         Analyze the following tweets about the cryptocurrency {coin_symbol} for investment sentiment.
         
         Tweets:
@@ -313,142 +392,609 @@ def analyze_sentiment_with_gemini(tweets_text, coin_symbol):
             "key_factors": ["factor1", "factor2", ...]
         }}
         """
+
+def parse_gemini_response(response_text):
+    """Parse Gemini's JSON answer, or return None if it has no usable sentiment score"""
+    # Extract JSON if surrounded by markdown code blocks
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0].strip()
         
-        # Generate the response
-        response = model.generate_content(prompt)
-        
-        # Parse the response as JSON
-        response_text = response.text
-        # Extract JSON if surrounded by markdown code blocks
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-        try:
-            result = json.loads(response_text)
+    try:
+        result = json.loads(response_text)
+        if isinstance(result, dict) and isinstance(result.get("sentiment_score"), (int, float)):
             return result
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing Gemini response as JSON: {e}")
-            logger.error(f"Response was: {response_text}")
-            
-            # Fallback to simple sentiment extraction
-            if isinstance(response_text, str) and "sentiment_score" in response_text:
-                try:
-                    # Try to extract just the sentiment score with regex
-                    match = re.search(r'"sentiment_score"\s*:\s*([-+]?\d*\.\d+|\d+)', response_text)
-                    if match:
-                        sentiment_score = float(match.group(1))
-                        return {"sentiment_score": sentiment_score, "analysis": "Partial analysis only"}
-                except Exception:
-                    pass
-                    
-            return {"sentiment_score": 0, "analysis": "Failed to parse analysis"}
-    
+        logger.error(f"Gemini response has no numeric sentiment score: {response_text}")
+        return None
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parsing Gemini response as JSON: {e}")
+        logger.error(f"Response was: {response_text}")
+        
+        # Fallback to simple sentiment extraction
+        if "sentiment_score" in response_text:
+            # Try to extract just the sentiment score with regex
+            match = re.search(r'"sentiment_score"\s*:\s*([-+]?\d*\.\d+|\d+)', response_text)
+            if match:
+                return {"sentiment_score": float(match.group(1)), "analysis": "Partial analysis only"}
+        
+        return None
+
+def build_incremental_prompt(prior, new_tweets_text, coin_symbol):
+    return f"""
+        You previously analyzed tweets about the cryptocurrency {coin_symbol} for investment sentiment.
+        Your previous result was:
+        {json.dumps(prior, ensure_ascii=False)}
+        
+        These tweets have been posted since:
+        {new_tweets_text}
+        
+        Update the previous result so it reflects the whole conversation including the new tweets.
+        Keep the parts of the analysis and key factors that still hold, and change the sentiment
+        score only as far as the new tweets justify.
+        
+        Format your response as JSON only, with the following structure:
+        {{
+            "sentiment_score": [score from -1.0 to 1.0 as a float],
+            "investment_analysis": "[brief analysis]",
+            "key_factors": ["factor1", "factor2", ...]
+        }}
+        """
+
+async def request_analysis(prompt, coin_symbol):
+    """Send a sentiment prompt to Gemini; None if no valid analysis arrived before the deadline"""
+    metrics.observe("gemini_prompt_chars", len(prompt))
+    try:
+        return await get_gemini_client().generate(prompt, parse_gemini_response, label=coin_symbol)
     except Exception as e:
         logger.error(f"Error calling Gemini API for {coin_symbol}: {e}")
-        return {"sentiment_score": 0, "analysis": f"API error: {str(e)}"}
+        return None
+
+async def analyze_sentiment(tweets_text, coin_symbol):
+    """
+    Analyze tweet sentiment using Google's Gemini API
+    Returns a dict with sentiment score and investment analysis, or None if no
+    valid analysis arrived before the deadline. Callers must treat None as
+    "sentiment unknown" rather than neutral.
+    """
+    if not tweets_text:
+        logger.warning(f"No tweets to analyze for {coin_symbol}")
+        return None
+    
+    return await request_analysis(build_sentiment_prompt(tweets_text, coin_symbol), coin_symbol)
+
+async def analyze_coin_sentiment(coin_symbol, tweets, state):
+    """
+    Analyze a coin's tweets incrementally against its stored sentiment state.
 
-def analyze_coin_data(helix_data, twitter_data):
-    """Analyze coin data from helix and Twitter to find top investment opportunities"""
-    coin_analysis = {}
-    helix_coins_map = {}
+    Tweets already covered by the stored result are not sent again: if none
+    are new the stored result is reused without calling Gemini, otherwise only
+    the new tweets go out together with the previous result to be updated.
+    sentiment_state decides when a full re-analysis is due instead. Returns the
+    analysis (or None on failure) and the mode used.
+    """
+    mode, to_send = plan_analysis(state, coin_symbol, tweets)
+    metrics.incr(f"sentiment_{mode}_analyses")
+    if mode == SKIP:
+        logger.info(f"No new tweets for {coin_symbol}, reusing its previous analysis")
+        return prior_analysis(state, coin_symbol), mode
     
-    # Create a map of coin symbols to helix data
-    for item in helix_data['data']:
-        symbol = item['symbol'].split('/')[0]
-        price_str = item['price']
+    tweets_text = "\n\n".join(tweet.text for tweet in to_send)
+    metrics.observe(f"sentiment_{mode}_tweets_sent", len(to_send))
+    if mode == INCREMENTAL:
+        logger.info(f"Updating {coin_symbol} analysis with {len(to_send)} new of {len(tweets)} tweets")
+        analysis = await request_analysis(
+            build_incremental_prompt(prior_analysis(state, coin_symbol), tweets_text, coin_symbol), coin_symbol)
+    else:
+        analysis = await analyze_sentiment(tweets_text, coin_symbol)
+    
+    if analysis:
+        record_analysis(state, coin_symbol, analysis, tweets, mode)
+    return analysis, mode
+
+def coin_price_entry(item, live_prices=None):
+    """Price, 24h change and where the price came from for one Helix pair"""
+    price_str = item['price']
+    
+    # Handle price formatting issues
+    try:
+        # Remove commas and any other non-numeric characters except decimal points
+        clean_price = re.sub(r'[^\d.]', '', price_str)
+        price = float(clean_price) if clean_price else 0.0
+    except (ValueError, TypeError):
+        price = 0.0
+    
+    change_str = item['change_24h']
+    try:
+        change = float(change_str.strip('%')) if change_str != 'N/A' else 0.0
+    except (ValueError, TypeError, AttributeError):
+        change = 0.0
+    
+    price_source = 'scrape'
+    live = (live_prices or {}).get(item['symbol'].upper())
+    if live and live.get('price'):
+        price = live['price']
+        if live.get('change_24h') is not None:
+            change = live['change_24h']
+        price_source = 'live'
+    
+    return {
+        'price': price,
+        'change_24h': change,
+        'price_source': price_source
+    }
+
+def build_price_map(helix_data, live_prices=None):
+    """Map coin symbols to their price entry, preferring a fresh live snapshot when one exists"""
+    if live_prices is None:
+        live_prices = load_price_snapshot()
+        if live_prices:
+            logger.info(f"Using live prices for up to {len(live_prices)} markets from the price stream")
+    
+    return {
+        item['symbol'].split('/')[0]: coin_price_entry(item, live_prices)
+        for item in helix_data['data']
+    }
+
+def score_coin(coin, tweets, price_info, analysis=None, weights=None, mention_entry=None):
+    """
+    Build a coin's ranking record from its tweets, price and sentiment analysis.
+    Returns None for coins without a valid price, which are never ranked.
+    """
+    weights = {**SCORE_WEIGHTS, **(weights or {})}
+    price = price_info['price']
+    price_change = price_info['change_24h']
+    if price <= 0:
+        return None
+    
+    # Calculate engagement metrics
+    total_likes = sum(tweet.like_count for tweet in tweets)
+    total_retweets = sum(tweet.retweet_count for tweet in tweets)
+    total_replies = sum(tweet.reply_count for tweet in tweets)
+    tweet_count = len(tweets)
+    engagement_score = (total_likes + total_retweets*2 + total_replies*1.5) / max(1, tweet_count)
+    
+    analysis = analysis or {}
+    sentiment_score = analysis.get('sentiment_score')
+    
+    # Calculate investment score with heavier weight on Gemini sentiment analysis.
+    # A coin whose analysis failed has no sentiment term, which alone would score
+    # it like a neutral one; it is flagged sentiment_missing instead, and the
+    # Leaderboard ranks flagged coins below every coin with a sentiment.
+    investment_score = (engagement_score * weights['engagement']) + (price_change * weights['price_change'])
+    if sentiment_score is not None:
+        investment_score += sentiment_score * weights['sentiment']
+    
+    mention_entry = mention_entry or {"kinds": {}, "co_mentions": {}}
+    return {
+        'symbol': coin,
+        'price': price,
+        'price_change_24h': price_change,
+        'price_source': price_info['price_source'],
+        'tweet_count': tweet_count,
+        'total_likes': total_likes,
+        'total_retweets': total_retweets,
+        'total_replies': total_replies,
+        'engagement_score': engagement_score,
+        'sentiment_score': sentiment_score,
+        'sentiment_missing': sentiment_score is None,
+        'gemini_analysis': analysis.get('gemini_analysis', ''),
+        'key_factors': analysis.get('key_factors', []),
+        'mention_kinds': mention_entry['kinds'],
+        'co_mentions': dict(sorted(mention_entry['co_mentions'].items(), key=lambda x: x[1], reverse=True)[:5]),
+        'investment_score': investment_score
+    }
+
+async def analyze_coin_data(helix_data, results, weights=None, allow_network=True, top_n=10, leaderboard=None):
+    """
+    Analyze coin data from helix and Twitter to find top investment opportunities
+
+    Sentiment comes from the analyses cached in results. Only coins without a
+    cached analysis are sent to Gemini, and only when allow_network is set.
+    Coins left without sentiment (offline, or the call failed) are flagged
+    sentiment_missing and ranked below every coin that has one.
+
+    Engagement is computed over every tweet that really mentions the coin
+    according to the cross-mention index, whichever search found it. Tweets a
+    search returned only because of a handle or URL match are left out.
+
+    Coins are ranked in a Leaderboard. Passing the one that was filled with
+    partial scores during the scrape re-scores it in place, so its version keeps
+    increasing and coins the full analysis rejects are dropped from it.
+    Returns the top coins and the mention index.
+    """
+    leaderboard = leaderboard if leaderboard is not None else Leaderboard(top_n)
+    helix_coins_map = build_price_map(helix_data)
+    
+    # Tag all tweets against the full symbol list in one linear pass each
+    tagger = SymbolTagger(helix_coins_map.keys())
+    mention_index = build_mention_index(results.tweets, tagger)
+    
+    # Analyze each coin
+    for coin in helix_coins_map:
+        entry = mention_index.get(coin)
+        tweets = entry["tweets"] if entry else []
+        if not tweets:
+            leaderboard.discard(coin)
+            continue
         
-        # Handle price formatting issues
-        try:
-            # Remove commas and any other non-numeric characters except decimal points
-            clean_price = re.sub(r'[^\d.]', '', price_str)
-            price = float(clean_price) if clean_price else 0.0
-        except (ValueError, TypeError):
-            price = 0.0
+        # Reuse the sentiment from the scrape run when we have it
+        analysis = results.analyses.get(coin)
+        if analysis is None and allow_network:
+            # Aggregate tweet texts for Gemini analysis
+            all_tweet_texts = "\n".join([f"{i+1}. {tweet.text}" for i, tweet in enumerate(tweets[:10])])
+            
+            # Get Gemini analysis; a failed call leaves the coin without sentiment
+            gemini_result = await analyze_sentiment(all_tweet_texts, coin)
+            analysis = summarize_coin_analysis(gemini_result) if gemini_result else None
         
-        change_str = item['change_24h']
-        try:
-            change = float(change_str.strip('%')) if change_str != 'N/A' else 0.0
-        except (ValueError, TypeError):
-            change = 0.0
+        record = score_coin(coin, tweets, helix_coins_map[coin], analysis, weights, entry)
+        if record is None:
+            leaderboard.discard(coin)
+        else:
+            leaderboard.update(record)
+    
+    return leaderboard.top(top_n), mention_index
+
+# Browser launch options shared by the standalone scraper and the fused pipeline
+BROWSER_LAUNCH_OPTIONS = {
+    "headless": False,
+    "timeout": 120000,  # 2 minute timeout for launch
+    "args": [
+        "--disable-web-security",
+        "--disable-features=IsolateOrigins",
+        "--disable-site-isolation-trials",
+        "--no-sandbox",
+        "--disable-dev-shm-usage"
+    ]
+}
+
+async def new_twitter_context(browser):
+    """Create a browser context with the scraper's viewport, user agent and timeouts, but no cookies"""
+    context = await browser.new_context(
+        viewport={"width": 1280, "height": 800},
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    )
+    
+    # Longer timeout for all operations (2 minutes)
+    context.set_default_timeout(120000)
+    return context
+
+async def create_twitter_context(browser):
+    """Create a browser context with Twitter cookies loaded, or None if they can't be loaded"""
+    context = await new_twitter_context(browser)
+    
+    # Load cookies
+    cookies_loaded = await load_cookies(context)
+    if not cookies_loaded:
+        logger.error("Failed to load cookies. Please check the cookies file.")
+        await context.close()
+        return None
+    
+    return context
+
+async def open_twitter_home(page):
+    """Go to Twitter first to ensure we're properly logged in"""
+    from playwright.async_api import TimeoutError
+    
+    logger.info("Navigating to Twitter homepage")
+    await page.goto("https://twitter.com/home", timeout=120000)
+    
+    # Wait for the page to load
+    try:
+        await page.wait_for_selector("article", timeout=30000)
+        logger.info("Twitter homepage loaded successfully")
+    except TimeoutError:
+        logger.warning("Twitter timeline articles not found within timeout")
+        logger.info("Continuing anyway, may not be logged in properly")
+    
+    # Pause to ensure page is fully loaded
+    await asyncio.sleep(5)
+
+async def iter_coin_list(coin_symbols):
+    """Adapt a plain list of coin symbols to the async stream process_coins expects"""
+    for coin in coin_symbols:
+        yield coin
+
+async def detect_throttling(page):
+    """Return a short reason if the page shows a rate-limit or login wall, else None"""
+    try:
+        url = page.url
+        if "/login" in url or "/i/flow/login" in url or "/account/access" in url:
+            return "login wall"
         
-        helix_coins_map[symbol] = {
-            'price': price,
-            'change_24h': change
+        return await page.evaluate(r"""
+        () => {
+            const text = document.body ? document.body.innerText : '';
+            if (/rate limit exceeded/i.test(text)) return 'rate limit';
+            if (/Something went wrong\. Try reloading/i.test(text)) return 'error page';
+            if (document.querySelector('[data-testid="loginButton"]')) return 'login wall';
+            return null;
         }
+        """)
+    except Exception as e:
+        logger.warning(f"Could not check page for throttling: {e}")
+        return None
+
+def summarize_coin_analysis(analysis):
+    """Keep only the fields of a Gemini result that get stored with the coin"""
+    return {
+        "sentiment_score": analysis.get("sentiment_score"),
+        "gemini_analysis": analysis.get("investment_analysis", analysis.get("analysis", "")),
+        "key_factors": analysis.get("key_factors", []),
+    }
+
+async def process_coins(page, coins, results, total=None, pacer=None, watchdog=None,
+                        leaderboard=None, prices=None):
+    """
+    Search Twitter and run sentiment analysis for each coin from an async stream.
+    Results are streamed into a ScrapeResults; returns the number of coins processed.
+    """
+    # Searches are paced by the AIMD pacer; extra pages beyond the caller's are
+    # only opened when it raises concurrency, up to MAX_SEARCH_CONCURRENCY
+    pacer = pacer or AIMDPacer(max_concurrency=MAX_SEARCH_CONCURRENCY)
+    watchdog = watchdog or BrowserWatchdog(page.context.browser)
+    history = load_volume_history()
+    sentiment_state = load_sentiment_state()
+    loop = asyncio.get_running_loop()
+    query_queue = asyncio.Queue(maxsize=MAX_SEARCH_CONCURRENCY)
+    idle_pages = [page]
+    browser_state = {"context": page.context, "in_flight": 0}
+    # Cleared while the context is being replaced so no search picks up a closing page
+    context_ready = asyncio.Event()
+    context_ready.set()
+    stop = asyncio.Event()
+    prices = prices if prices is not None else {}
+    counts = {"started": 0, "processed": 0, "errors": 0, "audits": 0}
     
-    # Group tweets by coin
-    coin_tweets = defaultdict(list)
-    for tweet in twitter_data:
-        coin_tweets[tweet['coin_symbol']].append(tweet)
+    async def feed_queries():
+        # The query planner packs coins that usually return only a handful of
+        # tweets into one combined cashtag search; busier coins keep their own
+        try:
+            async for query in plan_queries(coins, history):
+                if stop.is_set():
+                    break
+                await query_queue.put(query)
+        finally:
+            for _ in range(MAX_SEARCH_CONCURRENCY):
+                await query_queue.put(None)
     
-    # Analyze each coin
-    for coin, tweets in coin_tweets.items():
-        if coin not in helix_coins_map:
-            continue
+    async def recycle_context():
+        # Replace the whole context (cookies carried over) once the browser has
+        # grown too large; this also closes the caller's page
+        context_ready.clear()
+        try:
+            pages = list(idle_pages)
+            browser_state["context"], new_pages = await watchdog.recycle_context(
+                browser_state["context"], new_twitter_context, pages)
+            idle_pages[:] = new_pages
+        except Exception as e:
+            logger.error(f"Error recycling browser context: {e}")
+        finally:
+            context_ready.set()
+    
+    async def paced_search(query_text, label):
+        await pacer.acquire()
+        await context_ready.wait()
+        browser_state["in_flight"] += 1
+        search_page = idle_pages.pop() if idle_pages else await browser_state["context"].new_page()
+        started = loop.time()
+        tweets = []
+        throttled = None
+        try:
+            tweets = await search_twitter(search_page, query_text, label)
+            if not tweets:
+                throttled = await detect_throttling(search_page)
+        finally:
+            try:
+                # Swap in a fresh page if this one's memory has grown too large
+                search_page = await watchdog.check_page(search_page)
+            except Exception as e:
+                logger.warning(f"Memory check failed after searching {label}: {e}")
+            idle_pages.append(search_page)
+            browser_state["in_flight"] -= 1
+            await pacer.release(loop.time() - started, len(tweets), throttled)
+            metrics.incr("search_page_loads")
         
-        # Calculate engagement metrics
-        total_likes = sum(tweet['like_count'] for tweet in tweets)
-        total_retweets = sum(tweet['retweet_count'] for tweet in tweets)
-        total_replies = sum(tweet['reply_count'] for tweet in tweets)
-        tweet_count = len(tweets)
-        
-        # Aggregate tweet texts for Gemini analysis
-        all_tweet_texts = "\n".join([f"{i+1}. {tweet.get('text', '')}" for i, tweet in enumerate(tweets[:10])])
-        
-        # Get Gemini analysis
-        gemini_result = analyze_sentiment_with_gemini(all_tweet_texts, coin)
-        sentiment_score = gemini_result.get('sentiment_score', 0)
-        investment_analysis = gemini_result.get('investment_analysis', '')
-        key_factors = gemini_result.get('key_factors', [])
-        
-        # Price data
-        price = helix_coins_map[coin]['price']
-        price_change = helix_coins_map[coin]['change_24h']
-        
-        # Calculate a score based on engagement, sentiment and price change
-        engagement_score = (total_likes + total_retweets*2 + total_replies*1.5) / max(1, tweet_count)
-        
-        # Only consider coins with valid prices
-        if price > 0:
-            # Calculate investment score with heavier weight on Gemini sentiment analysis
-            investment_score = (
-                (engagement_score * 0.3) + 
-                (sentiment_score * 40) + 
-                (price_change * 0.5)
-            )
+        if watchdog.context_recycle_due and browser_state["in_flight"] == 0 and context_ready.is_set():
+            await recycle_context()
+        return tweets
+    
+    async def audit_recall(query, assigned):
+        """Re-run each coin of a packed query on its own and compare what was found"""
+        single_total = 0
+        found_total = 0
+        for coin in query.coins:
+            single_urls = {t.get("url") for t in await paced_search(coin_query(coin), coin) if t.get("url")}
+            packed_urls = {t.url for t in assigned[coin]}
+            single_total += len(single_urls)
+            found_total += len(single_urls & packed_urls)
+        
+        metrics.incr("planner_recall_audit_single_tweets", single_total)
+        metrics.incr("planner_recall_audit_found_tweets", found_total)
+        recall = found_total / single_total if single_total else 1.0
+        logger.info(f"Recall audit for {query.label}: packed search found {found_total}/{single_total} tweets from individual searches ({recall:.0%})")
+    
+    async def handle_coin(coin, tweets):
+        with log_context(coin=coin, stage="analyze"):
+            await analyze_coin(coin, tweets)
+    
+    async def analyze_coin(coin, tweets):
+        update_volume_history(history, coin, len(tweets))
+        
+        if tweets:
+            logger.info(f"Found {len(tweets)} tweets for {coin}")
             
-            coin_analysis[coin] = {
-                'symbol': coin,
-                'price': price,
-                'price_change_24h': price_change,
-                'tweet_count': tweet_count,
-                'total_likes': total_likes,
-                'total_retweets': total_retweets,
-                'total_replies': total_replies,
-                'engagement_score': engagement_score,
-                'sentiment_score': sentiment_score,
-                'gemini_analysis': investment_analysis,
-                'key_factors': key_factors,
-                'investment_score': investment_score
-            }
+            # Analyze tweets with Gemini, sending only what it hasn't seen yet
+            coin_analysis = None
+            try:
+                # Only analyze if we have tweets
+                if any(t.text.strip() for t in tweets):
+                    analysis, mode = await analyze_coin_sentiment(coin, tweets, sentiment_state)
+                    
+                    if analysis:
+                        logger.info(f"Analyzed {len(tweets)} tweets for {coin} ({mode})")
+                        
+                        # Mark the records in place rather than copying them
+                        for tweet in tweets:
+                            tweet.analyzed = True
+                        
+                        coin_analysis = summarize_coin_analysis(analysis)
+                    else:
+                        logger.warning(f"Failed to analyze tweets for {coin}")
+            except Exception as e:
+                logger.error(f"Error analyzing tweets for {coin}: {e}")
+            
+            # Store and stream out the tweets and analysis in one go
+            results.add_coin(coin, tweets, coin_analysis)
+            
+            # Provisional score from this coin's own search results, for the
+            # partial leaderboard; the final analysis re-scores it against the
+            # full cross-mention index. prices may still be growing mid-run.
+            if leaderboard is not None and coin in prices:
+                record = score_coin(coin, tweets, prices[coin], coin_analysis)
+                if record is not None:
+                    leaderboard.update(record)
+        
+        counts["processed"] += 1
     
-    # Sort coins by investment score
-    sorted_coins = sorted(
-        coin_analysis.values(), 
-        key=lambda x: x['investment_score'], 
-        reverse=True
-    )
+    async def search_worker():
+        while True:
+            query = await query_queue.get()
+            if query is None:
+                return
+            if stop.is_set():
+                # Keep draining so the feeder never blocks
+                continue
+            
+            counts["started"] += len(query.coins)
+            # total is unknown when coins arrive live from the Helix scraper
+            progress = f"{counts['started']}/{total}" if total else f"{counts['started']}"
+            logger.info(f"Processing {query.label} ({progress})")
+            
+            try:
+                with log_context(coin=query.label, stage="search"):
+                    raw_tweets = await paced_search(query.query, query.label)
+                discovery_time = datetime.now().isoformat()
+                
+                if query.packed:
+                    metrics.incr("planner_packed_queries")
+                    metrics.incr("planner_packed_coins", len(query.coins))
+                    assigned, unmatched = demultiplex_tweets(raw_tweets, query.coins, discovery_time)
+                    metrics.incr("planner_unmatched_tweets", unmatched)
+                    if counts["audits"] < RECALL_AUDIT_QUERIES:
+                        counts["audits"] += 1
+                        await audit_recall(query, assigned)
+                else:
+                    metrics.incr("planner_single_queries")
+                    coin = query.coins[0]
+                    assigned = {coin: [Tweet.from_scraped(tweet, coin, discovery_time) for tweet in raw_tweets]}
+                
+                for coin, tweets in assigned.items():
+                    await handle_coin(coin, tweets)
+                
+                metrics.set_gauge("coins_processed", counts["processed"])
+                metrics.write_metrics()
+                logger.info(f"Search rate now {pacer.rate:.1f}/min (delay {pacer.delay:.2f}s, concurrency {pacer.concurrency})")
+                
+            except Exception as e:
+                logger.error(f"Error processing {query.label}: {e}")
+                counts["errors"] += 1
+                
+                # If we get too many errors, stop to avoid wasting time
+                if counts["errors"] > 10:
+                    logger.error(f"Too many errors ({counts['errors']}), stopping processing")
+                    stop.set()
     
-    # Get top 10 or all if less than 10
-    top_coins = sorted_coins[:min(10, len(sorted_coins))]
+    feeder = asyncio.create_task(feed_queries())
+    publisher = asyncio.create_task(leaderboard.run()) if leaderboard is not None else None
+    lag_monitor = asyncio.create_task(metrics.monitor_loop_lag())
+    try:
+        await asyncio.gather(*(search_worker() for _ in range(MAX_SEARCH_CONCURRENCY)))
+    finally:
+        if not feeder.done():
+            feeder.cancel()
+        if publisher is not None:
+            publisher.cancel()
+        lag_monitor.cancel()
+        
+        # Close the extra search pages; the caller owns the first one (unless it was recycled)
+        for search_page in idle_pages:
+            if search_page is not page:
+                await search_page.close()
+        
+        save_volume_history(history)
+        save_sentiment_state(sentiment_state)
+    
+    return counts["processed"]
+
+def save_mention_index(mention_index, path=MENTION_INDEX_FILE):
+    """Write the cross-mention index (counts only, not the tweets) for other consumers"""
+    summary = {
+        symbol: {
+            "tweet_count": len(entry["tweets"]),
+            "kinds": entry["kinds"],
+            "co_mentions": entry["co_mentions"],
+        }
+        for symbol, entry in sorted(mention_index.items())
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+def mention_index_path(output_path):
+    """The mention index belonging to an analysis file, kept next to it"""
+    if os.path.abspath(output_path) == ANALYSIS_OUTPUT_FILE:
+        return MENTION_INDEX_FILE
+    return f"{os.path.splitext(output_path)[0]}_mentions.json"
+
+async def save_coin_analysis(helix_data, results, coin_count, weights=None, allow_network=True,
+                       top_n=10, output_path=ANALYSIS_OUTPUT_FILE, leaderboard=None, index_path=None):
+    """
+    Rank the scraped coins, write the analysis file and print the top coins.
+    A LeaderboardPublisher from the scrape is re-scored and published as complete.
+    """
+    logger.info("Starting coin analysis")
+    board = leaderboard.leaderboard if leaderboard is not None else None
+    top_coins, mention_index = await analyze_coin_data(helix_data, results, weights, allow_network, top_n, board)
+    save_mention_index(mention_index, index_path or mention_index_path(output_path))
+    if leaderboard is not None:
+        leaderboard.total = coin_count
+        leaderboard.publish(complete=True)
+    
+    # Save analysis results
+    analysis_result = {
+        "top_investment_coins": top_coins,
+        "analysis_timestamp": datetime.now().isoformat(),
+        "total_coins_analyzed": coin_count,
+        "total_tweets_analyzed": results.tweet_count
+    }
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(analysis_result, f, indent=2, ensure_ascii=False)
+    
+    logger.info(f"Analysis complete. Top {len(top_coins)} coins saved to {output_path}")
+    
+    # Print top coins to console
+    print("\n===== TOP COINS TO INVEST IN =====")
+    for i, coin in enumerate(top_coins, 1):
+        print(f"{i}. {coin['symbol']} - Price: ${coin['price']:.6f} - Change: {coin['price_change_24h']}%")
+        sentiment = "unavailable" if coin['sentiment_missing'] else f"{coin['sentiment_score']:.2f}"
+        print(f"   Score: {coin['investment_score']:.2f} | Sentiment: {sentiment}")
+        print(f"   Analysis: {coin['gemini_analysis']}")
+        print(f"   Key factors: {', '.join(coin['key_factors']) if coin['key_factors'] else 'None identified'}")
+        print()
+    print("=================================\n")
     
     return top_coins
 
-async def scrape_twitter_for_coins():
-    """Scrape Twitter for the coin data from the loaded coins list"""
-    start_time = time.time()
+async def scrape_twitter_for_coins(analyze=True):
+    """
+    Scrape Twitter for the coin data from the loaded coins list
+
+    With analyze=False only the tweets and per-coin sentiment are collected;
+    ranking can then be done later with the analyze subcommand.
+    """
+    from playwright.async_api import async_playwright
     
     helix_data = load_helix_data()
     if not helix_data:
@@ -462,142 +1008,26 @@ async def scrape_twitter_for_coins():
     
     logger.info(f"Starting Twitter scraper for {len(coin_symbols)} coins")
     
+    leaderboard = LeaderboardPublisher(total=len(coin_symbols))
+    prices = build_price_map(helix_data)
+    
     async with async_playwright() as p:
-        browser_launch_options = {
-            "headless": False,
-            "timeout": 120000,  # 2 minute timeout for launch
-            "args": [
-                "--disable-web-security",
-                "--disable-features=IsolateOrigins",
-                "--disable-site-isolation-trials",
-                "--no-sandbox",
-                "--disable-dev-shm-usage"
-            ]
-        }
-        
-        logger.info(f"Launching browser with options: {browser_launch_options}")
-        browser = await p.chromium.launch(**browser_launch_options)
+        logger.info(f"Launching browser with options: {BROWSER_LAUNCH_OPTIONS}")
+        browser = await p.chromium.launch(**BROWSER_LAUNCH_OPTIONS)
         
-        context = await browser.new_context(
-            viewport={"width": 1280, "height": 800},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        
-        # Longer timeout for all operations (2 minutes)
-        context.set_default_timeout(120000)
-        
-        # Load cookies
-        cookies_loaded = await load_cookies(context)
-        if not cookies_loaded:
-            logger.error("Failed to load cookies. Please check the cookies file.")
+        context = await create_twitter_context(browser)
+        if context is None:
             await browser.close()
             return
         
-        # Create a new page
-        page = await context.new_page()
-        
-        # Initialize result storage
-        twitter_data = {}
-        processed_count = 0
-        error_count = 0
-        
-        # Take screenshots for debugging
-        # Disabling screenshots to save storage space
-        # screenshot_dir = os.path.join(SCRIPT_DIR, "screenshots")
-        # os.makedirs(screenshot_dir, exist_ok=True)
-        
+        # Initialize result storage, streamed to disk as each coin completes
+        results = ScrapeResults(TWITTER_DATA_FILE)
         try:
-            # Go to Twitter first to ensure we're properly logged in
-            logger.info("Navigating to Twitter homepage")
-            await page.goto("https://twitter.com/home", timeout=120000)
-            
-            # Wait for the page to load
-            try:
-                await page.wait_for_selector("article", timeout=30000)
-                logger.info("Twitter homepage loaded successfully")
-            except TimeoutError:
-                logger.warning("Twitter timeline articles not found within timeout")
-                logger.info("Continuing anyway, may not be logged in properly")
-            
-            # Pause to ensure page is fully loaded
-            await asyncio.sleep(5)
-            
-            # Take a screenshot after initial page load
-            # Disabling screenshot to save storage space
-            # await page.screenshot(path=os.path.join(screenshot_dir, "twitter_initial.png"))
-            # logger.info(f"Saved initial screenshot")
-            
-            # Process each coin symbol
-            for coin in coin_symbols:
-                logger.info(f"Processing coin {coin} ({processed_count + 1}/{len(coin_symbols)})")
-                
-                try:
-                    # Only take screenshots for some coins to avoid disk space issues
-                    # Disabling screenshots to save storage space
-                    # if processed_count % 5 == 0:  # Take screenshot every 5 coins
-                    #     try:
-                    #         await page.screenshot(path=os.path.join(screenshot_dir, f"search_{coin}.png"))
-                    #     except Exception as e:
-                    #         logger.warning(f"Failed to take screenshot for {coin}: {e}")
-                    
-                    # Search Twitter for this coin
-                    tweets = await search_twitter_for_coin(page, coin)
-                    
-                    if tweets:
-                        logger.info(f"Found {len(tweets)} tweets for {coin}")
-                        
-                        # Store the tweets in our result
-                        twitter_data[coin] = tweets
-                        
-                        # Analyze tweets with Gemini
-                        tweets_text = "\n\n".join([t["text"] for t in tweets])
-                        try:
-                            # Only analyze if we have tweets
-                            if tweets_text.strip():
-                                # Apply rate limiting for API key usage
-                                analysis = analyze_sentiment_with_gemini(tweets_text, coin)
-                                
-                                if analysis:
-                                    logger.info(f"Analyzed {len(tweets)} tweets for {coin}")
-                                    
-                                    # Update the twitter data with the analysis
-                                    twitter_data[coin] = [
-                                        {**tweet, "analyzed": True}
-                                        for tweet in twitter_data[coin]
-                                    ]
-                                    
-                                    # Add analysis to the coin data
-                                    twitter_data[f"{coin}_analysis"] = {
-                                        "sentiment_score": analysis["sentiment_score"],
-                                        "gemini_analysis": analysis["gemini_analysis"],
-                                        "key_factors": analysis["key_factors"],
-                                    }
-                                else:
-                                    logger.warning(f"Failed to analyze tweets for {coin}")
-                        except Exception as e:
-                            logger.error(f"Error analyzing tweets for {coin}: {e}")
-                    
-                    processed_count += 1
-                    
-                    # Save progress incrementally
-                    if processed_count % 5 == 0 or processed_count == len(coin_symbols):
-                        with open(TWITTER_DATA_FILE, 'w') as f:
-                            json.dump(twitter_data, f, indent=2)
-                        logger.info(f"Saved data for {processed_count}/{len(coin_symbols)} coins processed so far")
-                    
-                    # Random delay between requests (2-5 seconds)
-                    delay = random.uniform(2, 5)
-                    logger.info(f"Waiting {delay:.2f} seconds before next request")
-                    await asyncio.sleep(delay)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing coin {coin}: {e}")
-                    error_count += 1
-                    
-                    # If we get too many errors, break out to avoid wasting time
-                    if error_count > 10:
-                        logger.error(f"Too many errors ({error_count}), stopping processing")
-                        break
+            # Create a new page
+            page = await context.new_page()
+            await open_twitter_home(page)
+            await process_coins(page, iter_coin_list(coin_symbols), results, total=len(coin_symbols),
+                                leaderboard=leaderboard, prices=prices)
         except Exception as e:
             logger.error(f"Error during scraping: {e}")
         finally:
@@ -607,41 +1037,105 @@ async def scrape_twitter_for_coins():
                 logger.info("Browser closed successfully")
             except Exception as e:
                 logger.error(f"Error closing browser: {e}")
+            results.close()
+    
+    logger.info(f"Collected {results.tweet_count} tweets, peak RSS {peak_rss_mb():.1f} MB")
     
     # Analyze the data if we have tweets
-    if twitter_data:
-        logger.info("Starting coin analysis with Gemini API")
-        top_coins = analyze_coin_data(helix_data, twitter_data)
-        
-        # Save analysis results
-        analysis_result = {
-            "top_investment_coins": top_coins,
-            "analysis_timestamp": datetime.now().isoformat(),
-            "total_coins_analyzed": len(coin_symbols),
-            "total_tweets_analyzed": sum(len(tweets) for tweets in twitter_data.values())
-        }
-        
-        with open(ANALYSIS_OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(analysis_result, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Analysis complete. Top {len(top_coins)} coins saved to {ANALYSIS_OUTPUT_FILE}")
-        
-        # Print top coins to console
-        print("\n===== TOP COINS TO INVEST IN =====")
-        for i, coin in enumerate(top_coins, 1):
-            print(f"{i}. {coin['symbol']} - Price: ${coin['price']:.6f} - Change: {coin['price_change_24h']}%")
-            print(f"   Score: {coin['investment_score']:.2f} | Sentiment: {coin['sentiment_score']:.2f}")
-            print(f"   Analysis: {coin['gemini_analysis']}")
-            print(f"   Key factors: {', '.join(coin['key_factors']) if coin['key_factors'] else 'None identified'}")
-            print()
-        print("=================================\n")
+    if results and analyze:
+        await save_coin_analysis(helix_data, results, len(coin_symbols), leaderboard=leaderboard)
     
     return True
 
-async def main():
+def reanalyze_stored_data(args):
+    """Re-score stored tweets and cached sentiments with new weights, fully offline"""
+    start_time = time.time()
+    
+    helix_data = load_helix_data(args.helix)
+    if not helix_data:
+        logger.error(f"No helix data found at {args.helix}")
+        return 1
+    
+    if not os.path.exists(args.input):
+        logger.error(f"No stored tweet data found at {args.input}. Run the scrape subcommand first.")
+        return 1
+    
+    results = load_results(args.input)
+    logger.info(f"Loaded {results.tweet_count} tweets and {len(results.analyses)} cached analyses in {time.time() - start_time:.2f}s")
+    
+    weights = {
+        "engagement": args.engagement_weight,
+        "sentiment": args.sentiment_weight,
+        "price_change": args.price_weight,
+    }
+    asyncio.run(save_coin_analysis(helix_data, results, len(extract_coin_symbols(helix_data)), weights,
+                                   allow_network=False, top_n=args.top, output_path=args.output,
+                                   index_path=args.index_output))
+    logger.info(f"Re-analysis finished in {time.time() - start_time:.2f}s")
+    return 0
+
+def export_stored_data(args):
+    """Export stored NDJSON results as a single JSON document grouped by coin"""
+    if not os.path.exists(args.input):
+        logger.error(f"No stored tweet data found at {args.input}")
+        return 1
+    
+    results = load_results(args.input)
+    exported = {
+        coin: {
+            "tweets": [tweet.to_dict() for tweet in tweets],
+            "analysis": results.analyses.get(coin),
+        }
+        for coin, tweets in results.tweets.items()
+    }
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(exported, f, indent=2, ensure_ascii=False)
+    
+    logger.info(f"Exported {results.tweet_count} tweets for {len(exported)} coins to {args.output}")
+    return 0
+
+def parse_args(argv=None):
+    """Parse the command line; with no subcommand a full scrape + analysis run is done"""
+    parser = argparse.ArgumentParser(description="Twitter coin scraper and analyzer with Gemini AI")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    subparsers.add_parser("run", help="Scrape Twitter and rank coins (default)")
+    subparsers.add_parser("scrape", help="Scrape tweets and sentiment only, without ranking")
+    
+    analyze_parser = subparsers.add_parser("analyze", help="Re-rank stored tweets offline using cached sentiment")
+    analyze_parser.add_argument("--input", default=TWITTER_DATA_FILE, help="Stored NDJSON tweet data")
+    analyze_parser.add_argument("--helix", default=HELIX_DATA_FILE, help="Helix market data")
+    analyze_parser.add_argument("--output", default=ANALYSIS_OUTPUT_FILE, help="Where to write the ranking")
+    analyze_parser.add_argument("--index-output", help="Where to write the mention index (default: next to --output)")
+    analyze_parser.add_argument("--engagement-weight", type=float, default=SCORE_WEIGHTS["engagement"])
+    analyze_parser.add_argument("--sentiment-weight", type=float, default=SCORE_WEIGHTS["sentiment"])
+    analyze_parser.add_argument("--price-weight", type=float, default=SCORE_WEIGHTS["price_change"])
+    analyze_parser.add_argument("--top", type=int, default=10, help="Number of coins to keep")
+    
+    export_parser = subparsers.add_parser("export", help="Export stored tweets as JSON grouped by coin")
+    export_parser.add_argument("--input", default=TWITTER_DATA_FILE, help="Stored NDJSON tweet data")
+    export_parser.add_argument("--output", default=os.path.join(SCRIPT_DIR, "twitter_coin_data.json"), help="Output JSON file")
+    
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main entry point"""
+    args = parse_args(argv)
+    command = args.command or "run"
+    setup_logging("twitter_scraper")
+    
+    if command == "analyze":
+        return reanalyze_stored_data(args)
+    if command == "export":
+        return export_stored_data(args)
+    
+    if not require_gemini_api_keys():
+        return 1
+    
     logger.info("Starting Twitter coin scraper and analyzer with Gemini AI")
-    await scrape_twitter_for_coins()
+    asyncio.run(scrape_twitter_for_coins(analyze=(command == "run")))
+    return 0
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    sys.exit(main())